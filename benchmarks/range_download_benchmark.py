@@ -0,0 +1,199 @@
+"""
+Downloads a generated file from a local stand-in server with URLDownload, in a single stream
+and in concurrent ranges, against servers that serve ranges, ignore them or drop connections.
+
+The server throttles its responses so the transfer time is measurable on loopback. Every row
+reports the runtime, whether the downloaded file matches the served one and whether a partial
+file was left behind.
+
+Usage:
+    python -m benchmarks.range_download_benchmark --size-mb 64 --segments 4 --drop-probability 0.3
+"""
+import os
+import re
+import time
+import hashlib
+import random
+import argparse
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import setup_logging, DOWNLOAD_MIN_SEGMENT_SIZE
+from transcripto.services.download.url_download import URLDownload
+
+# bytes written between two pauses of the stand-in server
+SERVER_WRITE_SIZE = 256 * 1024
+SERVER_WRITE_DELAY_SECONDS = 0.002
+
+# range support of the stand-in server: all ranges, none, or only the one-byte probe of the first byte
+SERVER_MODES = ("ranges", "no-ranges", "probe-only")
+
+
+class StandInServer:
+    """
+    Threaded HTTP server serving one file, optionally dropping connections mid-response.
+    Ranges are only served when their If-Range matches the ETag of the file.
+    """
+
+    def __init__(self, data, mode="ranges", drop_probability=0.0):
+        self.data = data
+        self.etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.mode = mode
+        self.drop_probability = drop_probability
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), self.__get_handler())
+        self.url = f"http://127.0.0.1:{self.__server.server_port}/episode.mp3"
+
+
+    def __enter__(self):
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+    def __get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        return Handler
+
+
+    def handle(self, handler):
+        data = self.data
+        requested_range = handler.headers.get("range", "")
+        serves_range = self.mode == "ranges" or (self.mode == "probe-only" and requested_range == "bytes=0-0")
+        serves_range = serves_range and handler.headers.get("if-range", self.etag) == self.etag
+        match = re.match(r"bytes=(\d+)-(\d*)", requested_range) if serves_range else None
+
+        start, end, status = 0, len(data) - 1, 200
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), len(data) - 1) if match.group(2) else len(data) - 1
+            if start >= len(data):
+                handler.send_response(416)
+                handler.send_header("content-range", f"bytes */{len(data)}")
+                handler.send_header("content-length", "0")
+                handler.end_headers()
+                return
+            status = 206
+
+        body = data[start:end + 1]
+        handler.send_response(status)
+        handler.send_header("content-length", str(len(body)))
+        handler.send_header("etag", self.etag)
+        if self.mode != "no-ranges":
+            handler.send_header("accept-ranges", "bytes")
+        if status == 206:
+            handler.send_header("content-range", f"bytes {start}-{end}/{len(data)}")
+        handler.end_headers()
+
+        cut = random.randint(0, len(body)) if len(body) > 1 and random.random() < self.drop_probability else None
+        try:
+            for offset in range(0, len(body), SERVER_WRITE_SIZE):
+                piece = body[offset:offset + SERVER_WRITE_SIZE]
+                if cut is not None and offset + len(piece) > cut:
+                    handler.wfile.write(piece[:max(0, cut - offset)])
+                    handler.wfile.flush()
+                    handler.close_connection = True
+                    return
+                handler.wfile.write(piece)
+                time.sleep(SERVER_WRITE_DELAY_SECONDS)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client closed a range it no longer needs
+            handler.close_connection = True
+
+
+def download_once(server, output_path, segments, max_resumes):
+    """
+    Returns:
+        dict: Runtime, whether the download succeeded and matches the served file, and whether a partial file is left.
+    """
+    start_time = time.time()
+    try:
+        URLDownload(segments=segments, max_resumes=max_resumes).download(server.url, output_path.parent, output_path)
+        error = None
+    except Exception as e:
+        error = type(e).__name__
+
+    matches = error is None and output_path.exists() and output_path.read_bytes() == server.data
+
+    return {
+        "seconds": time.time() - start_time,
+        "error": error,
+        "matches": matches,
+        "partial_left": URLDownload.get_partial_path(output_path).exists(),
+    }
+
+
+def run_benchmark(size_mb=64, segments=4, drop_probability=0.3, max_resumes=30):
+    """
+    Returns:
+        list[dict]: One row per server mode, drop probability and download mode.
+    """
+    data = os.urandom(size_mb * 1024 * 1024)
+    if size_mb * 1024 * 1024 < segments * DOWNLOAD_MIN_SEGMENT_SIZE:
+        logging.warning(f"{size_mb}MB is too small to split in {segments} ranges, every download uses a single stream")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode in SERVER_MODES:
+            for drop in sorted({0.0, drop_probability}):
+                with StandInServer(data, mode, drop) as server:
+                    for download_segments in (1, segments):
+                        output_path = Path(temp_dir, f"{mode}_{drop}_{download_segments}.mp3")
+                        row = download_once(server, output_path, download_segments, max_resumes)
+                        rows.append({"server": mode, "drop": drop, "segments": download_segments, **row})
+
+        # a segmented download failing for good must not leave a partial file a later run would resume from
+        output_path = Path(temp_dir, "failed_then_resumed.mp3")
+        with StandInServer(data, "ranges", 1.0) as server:
+            failed = download_once(server, output_path, segments, max_resumes=0)
+        with StandInServer(data, "ranges") as server:
+            resumed = download_once(server, output_path, 1, max_resumes)
+        rows.append({"server": "fail, resume", "drop": 1.0, "segments": segments, **resumed, "error": failed["error"]})
+
+        # a partial file of a previous version of the file, e.g. before new ads were inserted, must not be resumed
+        output_path = Path(temp_dir, "changed_then_resumed.mp3")
+        with StandInServer(os.urandom(len(data)), "ranges", 1.0) as server:
+            failed = download_once(server, output_path, 1, max_resumes=0)
+        with StandInServer(data, "ranges") as server:
+            resumed = download_once(server, output_path, 1, max_resumes)
+        rows.append({"server": "changed, resume", "drop": 1.0, "segments": 1, **resumed, "error": failed["error"]})
+
+    return rows
+
+
+def print_report(rows):
+    print(f"{'server':<16} {'drop':>5} {'segments':>9} {'time':>8} {'match':>6} {'partial':>8}  error")
+    for row in rows:
+        print(
+            f"{row['server']:<16} {row['drop']:>5.2f} {row['segments']:>9} {row['seconds']:>7.2f}s "
+            f"{str(row['matches']):>6} {str(row['partial_left']):>8}  {row['error'] or ''}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Range download benchmark")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the served file in MB")
+    parser.add_argument("--segments", type=int, default=4, help="Ranges of the segmented downloads")
+    parser.add_argument("--drop-probability", type=float, default=0.3, help="Probability that the server drops a response")
+    parser.add_argument("--max-resumes", type=int, default=30, help="Resumes allowed per transfer")
+    parser.add_argument("--log-level", type=str, default="WARNING", help="Set logging level")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logging.info(f"Benchmarking range downloads of a {args.size_mb}MB file")
+    print_report(run_benchmark(args.size_mb, args.segments, args.drop_probability, args.max_resumes))
@@ -0,0 +1,85 @@
+"""
+Compares the NumPy silence splitter with `pydub.silence.split_on_silence` on the same audio.
+
+Both run with the chunking options of the speech recognition engine, the runtime of each
+is reported together with whether they found the same chunks.
+
+Usage:
+    python -m benchmarks.silence_split_benchmark fixtures/episode.mp3 --min-silence-len 1000 --silence-thresh -14
+"""
+import os
+import time
+import argparse
+import logging
+from pydub.silence import split_on_silence
+from config import setup_logging
+from transcripto.services.transcriptors.speech_recognition_transcriptor import SpeechRecognitionTranscriptor
+from transcripto.utils.silence import SilenceSplitter
+
+
+def run_benchmark(audio_paths, min_silence_len=1000, silence_thresh=-14, keep_silence=SpeechRecognitionTranscriptor.KEEP_SILENCE_MS):
+    """
+    Returns:
+        list[dict]: One row per fixture with the runtime of both splitters and whether their chunks match.
+    """
+    transcriptor = SpeechRecognitionTranscriptor()
+    rows = []
+
+    for audio_path in audio_paths:
+        audio = transcriptor.load_audio_segment(audio_path)
+
+        start_time = time.time()
+        pydub_chunks = split_on_silence(
+            audio,
+            min_silence_len = min_silence_len,
+            silence_thresh = audio.dBFS + silence_thresh,
+            keep_silence = keep_silence,
+        )
+        pydub_seconds = time.time() - start_time
+
+        start_time = time.time()
+        splitter = SilenceSplitter.from_audio_segment(audio)
+        chunk_ranges = splitter.split_on_silence(
+            min_silence_len = min_silence_len,
+            silence_thresh = splitter.dbfs + silence_thresh,
+            keep_silence = keep_silence,
+        )
+        numpy_seconds = time.time() - start_time
+
+        matches = len(chunk_ranges) == len(pydub_chunks) and all(
+            audio[start:end].raw_data == chunk.raw_data for (start, end), chunk in zip(chunk_ranges, pydub_chunks)
+        )
+
+        rows.append({
+            "audio": os.path.basename(audio_path),
+            "duration_seconds": len(audio) / 1000,
+            "chunks": len(chunk_ranges),
+            "pydub_seconds": pydub_seconds,
+            "numpy_seconds": numpy_seconds,
+            "matches": matches,
+        })
+
+    return rows
+
+
+def print_report(rows):
+    print(f"{'audio':<40} {'duration':>9} {'chunks':>7} {'pydub':>9} {'numpy':>9} {'speedup':>8} {'match':>6}")
+    for row in rows:
+        speedup = row["pydub_seconds"] / row["numpy_seconds"] if row["numpy_seconds"] else float("inf")
+        print(
+            f"{row['audio'][:40]:<40} {row['duration_seconds']:>8.0f}s {row['chunks']:>7} "
+            f"{row['pydub_seconds']:>8.2f}s {row['numpy_seconds']:>8.3f}s {speedup:>7.0f}x {str(row['matches']):>6}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Silence splitter benchmark")
+    parser.add_argument("audio", nargs="+", help="Fixture audio files")
+    parser.add_argument("--min-silence-len", type=int, default=1000, help="Minimum silence length to split audio (ms)")
+    parser.add_argument("--silence-thresh", type=int, default=-14, help="Silence threshold relative to dBFS")
+    parser.add_argument("--log-level", type=str, default="WARNING", help="Set logging level")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logging.info(f"Benchmarking silence splitting on {len(args.audio)} fixtures")
+    print_report(run_benchmark(args.audio, args.min_silence_len, args.silence_thresh))
@@ -0,0 +1,82 @@
+"""
+Compares the word error rate and runtime of Whisper transcriptions across time compression factors.
+
+Every fixture is transcribed at each speed. When a reference transcript is given (a .txt file
+with the same name as the fixture, in --references-dir), the word error rate is computed
+against it, otherwise against the uncompressed 1x transcript.
+
+Usage:
+    python -m benchmarks.time_compression_benchmark fixtures/episode.mp3 --speeds 1.0 1.25 1.5
+"""
+import os
+import time
+import argparse
+import logging
+from config import setup_logging
+from transcripto.services.transcriptors.wisper_transcriptor import WhisperTranscriptor
+from transcripto.services.transcriptors.whisper_model_registry import WhisperModelRegistry
+from transcripto.utils.audio import get_audio_duration
+from transcripto.utils.text import word_error_rate
+
+
+def run_benchmark(audio_paths, speeds, profile=None, language=None, references_dir=None):
+    """
+    Returns:
+        list[dict]: One row per fixture and speed with the runtime, real-time factor and word error rate.
+    """
+    speeds = sorted(set([1.0] + list(speeds)))
+    rows = []
+
+    for audio_path in audio_paths:
+        reference = None
+        if references_dir:
+            reference_path = os.path.join(references_dir, f"{os.path.splitext(os.path.basename(audio_path))[0]}.txt")
+            if os.path.exists(reference_path):
+                with open(reference_path, "r", encoding="utf-8") as f:
+                    reference = f.read()
+
+        for speed in speeds:
+            transcriptor = WhisperTranscriptor(profile=profile, streaming=True, speed=speed)
+            # load the model before timing, the first speed would pay for it otherwise
+            WhisperModelRegistry.get_model(transcriptor.model_name, transcriptor.device, transcriptor.dtype)
+
+            start_time = time.time()
+            output = transcriptor.transcribe(audio_path, language=language)
+            runtime = time.time() - start_time
+
+            if speed == 1.0 and reference is None:
+                reference = output["text"]
+
+            rows.append({
+                "audio": os.path.basename(audio_path),
+                "speed": speed,
+                "runtime_seconds": runtime,
+                "real_time_factor": runtime / get_audio_duration(audio_path),
+                "wer": word_error_rate(reference, output["text"]),
+            })
+
+    return rows
+
+
+def print_report(rows):
+    print(f"{'audio':<40} {'speed':>6} {'runtime':>9} {'RTF':>7} {'WER':>7}")
+    for row in rows:
+        print(
+            f"{row['audio'][:40]:<40} {row['speed']:>5.2f}x {row['runtime_seconds']:>8.1f}s "
+            f"{row['real_time_factor']:>7.3f} {row['wer']:>6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time compression benchmark")
+    parser.add_argument("audio", nargs="+", help="Fixture audio files")
+    parser.add_argument("--speeds", type=float, nargs="+", default=[1.0, 1.25, 1.5], help="Speed factors to compare")
+    parser.add_argument("--profile", type=str, default=None, help="Whisper decoding profile")
+    parser.add_argument("--language", type=str, default=None, help="Language of the fixtures, detected when omitted")
+    parser.add_argument("--references-dir", type=str, default=None, help="Directory with reference transcripts")
+    parser.add_argument("--log-level", type=str, default="WARNING", help="Set logging level")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logging.info(f"Benchmarking speeds {args.speeds} on {len(args.audio)} fixtures")
+    print_report(run_benchmark(args.audio, args.speeds, args.profile, args.language, args.references_dir))
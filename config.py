@@ -5,6 +5,90 @@ OUTPUT_DIR = "./output"
 TEMP_DIR = "./output/tmp"
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 
+# Downloads are streamed to disk in chunks of this size, peak memory does not grow with the episode
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Interrupted downloads resume from the partial file with Range requests, up to this many times
+DOWNLOAD_MAX_RESUMES = 5
+DOWNLOAD_TIMEOUT_SECONDS = (10, 60)
+# Ranges fetched concurrently when the server accepts them, 1 downloads in a single stream
+DOWNLOAD_SEGMENTS = 1
+DOWNLOAD_MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+
+# Process-wide HTTP connection pools shared by providers and downloaders
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 16
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_TIMEOUT_SECONDS = (10, 60)
+
+# Recognized chunk text by hash of the chunk audio and language, WAV chunks are only written for debugging
+SPEECH_RECOGNITION_CACHE_PATH = "./output/speech_recognition_cache.sqlite"
+SPEECH_RECOGNITION_EXPORT_CHUNKS = False
+# Recognition requests are capped by a token bucket, their concurrency adapts to throttling
+SPEECH_RECOGNITION_REQUESTS_PER_SECOND = 5
+SPEECH_RECOGNITION_MAX_CONCURRENCY = 8
+# Throttled requests back off exponentially up to the cap, errors like a rejected key are not retried
+SPEECH_RECOGNITION_MAX_RETRIES = 8
+SPEECH_RECOGNITION_BACKOFF_SECONDS = 1.0
+SPEECH_RECOGNITION_MAX_BACKOFF_SECONDS = 60.0
+# Silence criteria calibrated per file so chunks last between these durations, instead of the fixed thresholds
+SPEECH_RECOGNITION_AUTO_THRESHOLD = True
+SPEECH_RECOGNITION_CHUNK_SECONDS = (5, 30)
+
+WHISPER_MODEL_NAME = "turbo"
+WHISPER_MODELS_DIR = "./output/models"
+WHISPER_MODEL_CACHE_SIZE = 2
+# None decodes in resumable 30s windows whenever a checkpoint is kept, False opts out into one whole-file decode
+WHISPER_STREAMING = None
+WHISPER_TIME_COMPRESSION = 1.0
+WHISPER_MMAP_WEIGHTS = True
+WHISPER_PARALLEL_WORKERS = 4
+WHISPER_BATCH_SIZE = 8
+WHISPER_THREADS_PER_WORKER = 4
+
+# Named trade-offs between speed and accuracy, the options are passed to `model.transcribe`
+WHISPER_DECODING_PROFILES = {
+    "draft": {
+        "model_name": "tiny",
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0,),
+        "condition_on_previous_text": False,
+    },
+    "fast": {
+        "model_name": "small",
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0,),
+        "condition_on_previous_text": False,
+    },
+    "balanced": {
+        "model_name": "turbo",
+        "beam_size": None,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+    },
+    "accurate": {
+        "model_name": "large-v3",
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+    },
+}
+
+# Profiles the "auto" profile routes between, most accurate first, with their estimated real-time factor
+WHISPER_MODEL_TIERS = {
+    "accurate": 0.5,
+    "balanced": 0.15,
+    "fast": 0.05,
+}
+WHISPER_LATENCY_TARGET_SECONDS = 900
+
+# The bot first replies with a summary of a fast draft transcript, then replaces it with the refined one
+TELEGRAM_DRAFT_MODE = True
+
 DOAMINS_TEXT_SELECTORS =  {
     "ynet.co.il": {
         "selectors": {
@@ -1,3 +1,6 @@
 from .cli import cli_mode
 
-cli_mode()
+# guarded so spawned worker processes can import the package without re-running the CLI
+if __name__ == "__main__":
+    cli_mode()
+
@@ -3,10 +3,10 @@ import argparse
 import os
 from dotenv import load_dotenv
 from transcripto.handlers.tts_handler import process_tts
-from transcripto.handlers.transcription_handler import process_transcription
+from transcripto.handlers.transcription_handler import process_transcription, process_batch_transcription
 from transcripto.handlers.summarization_handler import process_summarization
 from transcripto.handlers.download_handler import process_download
-from config import setup_logging, TEMP_DIR, OUTPUT_DIR
+from config import setup_logging, TEMP_DIR, OUTPUT_DIR, WHISPER_DECODING_PROFILES
 from transcripto.utils.file import ensure_directories
 from .telegram_bot import start_loop_bot
 import asyncio
@@ -17,6 +17,7 @@ def cli_mode():
 
     parser = argparse.ArgumentParser(description="Audio Transcription Script with Improvements")
     parser.add_argument("--url", type=str, default="", help="URL or local path of the MP3 file")
+    parser.add_argument("--batch", type=str, default="", help="Text file with one URL or local path per line, transcribed together")
     parser.add_argument("--audio-ext", type=str, default="mp3", help="Default output audio ext, usually mp3")
     parser.add_argument("--temp-dir", type=str, default=TEMP_DIR, help="Directory for temporary files")
     parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR, help="Directory to save output files")
@@ -25,7 +26,17 @@ def cli_mode():
     parser.add_argument("--summarization_model", type=str, default="gemini-3-pro-preview", help="summarization model")
     parser.add_argument("--tts_engine", type=str, default="openai_gpt", help="text-to-speech engine")
     parser.add_argument("--tts_model", type=str, default="gpt-4o-audio-preview", help="text-to-speech model")
-    parser.add_argument("--language", type=str, default="en-US", help="Language code for transcription")
+    parser.add_argument("--language", type=str, default=None, help="Language code for transcription (e.g. he-IL), detected from the audio when omitted")
+    parser.add_argument("--profile", type=str, default=None, choices=list(WHISPER_DECODING_PROFILES) + ["auto"], help="Whisper decoding profile trading accuracy for speed, auto picks one per episode")
+    parser.add_argument("--speed", type=float, default=None, help="Transcribe a pitch-preserving sped up copy of the audio, e.g. 1.25 (wisper engines)")
+    parser.add_argument("--streaming", action=argparse.BooleanOptionalAction, default=None, help="Transcribe in 30 second windows with flat memory usage and resumable checkpoints, the default; --no-streaming decodes the whole file at once and cannot resume (wisper engine)")
+    parser.add_argument("--vad", action="store_true", help="Skip music and silence with a voice activity detection pre-pass (wisper engines)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the wisper_parallel engine")
+    parser.add_argument("--batch-size", type=int, default=None, help="Episodes decoded together by the wisper_batched engine")
+    parser.add_argument("--worker-pool", action="store_true", help="Transcribe the --batch episodes in workers pinned to disjoint CPU cores")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="Cores given to every --worker-pool worker")
+    parser.add_argument("--prefork", action="store_true", help="Load the model once and fork the --worker-pool workers sharing its weights (CPU)")
+    parser.add_argument("--pool-workers", type=int, default=None, help="Number of --worker-pool workers, derived from the core count when omitted")
     parser.add_argument("--force", action="store_true", help="Force recreation of output files")
     parser.add_argument("--summarize", action="store_true", help="Generate a summarized output file")
     parser.add_argument("--tts", action="store_true", help="Generate a text-to-speech output file")
@@ -49,6 +60,44 @@ def cli_mode():
                 asyncio.run(start_loop_bot(TELEGRAM_BOT_TOKEN))
             return
 
+        engine_options = {}
+        if args.profile:
+            engine_options["profile"] = args.profile
+        if args.speed:
+            engine_options["speed"] = args.speed
+        if args.streaming is not None:
+            engine_options["streaming"] = args.streaming
+        if args.vad:
+            engine_options["vad"] = True
+        if args.workers:
+            engine_options["workers"] = args.workers
+        if args.batch_size:
+            engine_options["batch_size"] = args.batch_size
+
+        if args.batch:
+            with open(args.batch, "r", encoding="utf-8") as f:
+                urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+            episodes = []
+            for url in urls:
+                file_title, audio_local_path, _ = process_download(url)
+                episodes.append((file_title, audio_local_path))
+
+            transcripts = process_batch_transcription(
+                episodes,
+                args.temp_dir,
+                args.transcript_engine,
+                language=args.language,
+                force=args.force,
+                worker_pool=args.worker_pool,
+                threads_per_worker=args.threads_per_worker,
+                pool_workers=args.pool_workers,
+                prefork=args.prefork,
+                **engine_options
+            )
+            logging.info(f"Batch transcription completed for {len(transcripts)} episodes.")
+            return
+
         file_title, audio_local_path, audio_metadata = process_download(args.url)
         logging.info(f"Metadata extracted from {audio_local_path}: {audio_metadata}")
 
@@ -59,7 +108,8 @@ def cli_mode():
             args.audio_ext,
             args.transcript_engine,
             language=args.language,
-            force=args.force
+            force=args.force,
+            **engine_options
         )
 
         summary_text = None
@@ -0,0 +1,39 @@
+import os
+import time
+import logging
+from transcripto.utils.audio import decode_to_pcm_file, is_pcm_file, PCM_EXTENSION
+from transcripto.utils.file import get_output_file
+
+
+def process_decode(audio_local_path, title, force=False):
+    """
+    Decodes a downloaded audio file once into the canonical 16 kHz mono PCM artifact,
+    stored next to the raw download and shared by every transcription engine.
+
+    Args:
+        audio_local_path (str): Path to the raw downloaded audio.
+        title (str): Episode title used to name the artifact.
+        force (bool): Decode again even if the artifact is up to date.
+
+    Returns:
+        str: Path to the PCM artifact.
+    """
+    if is_pcm_file(audio_local_path):
+        return audio_local_path
+
+    output_file = get_output_file(f"{title}_raw", PCM_EXTENSION.lstrip("."))
+
+    # cached artifact exists and is not older than the download it was decoded from
+    if not force and os.path.exists(output_file) and os.path.getmtime(output_file) >= os.path.getmtime(audio_local_path):
+        logging.info(f"Using existing decoded audio: {output_file}")
+        return output_file
+
+    start_time = time.time()
+    logging.info(f"Decoding {audio_local_path} to PCM...")
+
+    decode_to_pcm_file(audio_local_path, output_file)
+
+    logging.info(f"Decoding completed in {time.time() - start_time:.2f} seconds.")
+    logging.info(f"Decoded audio saved to {output_file}")
+
+    return output_file
@@ -4,7 +4,7 @@ import logging
 from pathlib import Path
 from config import TEMP_DIR, OUTPUT_DIR
 from transcripto.services.download.download_factory import DownloadFactory
-from transcripto.utils.file import save_to_file, get_output_file
+from transcripto.utils.file import get_output_file
 from transcripto.utils.mp3 import get_audio_metadata
 
 
@@ -25,14 +25,16 @@ def process_download(url, force=False):
         audio_metadata = get_audio_metadata(output_file)
         return target_filename, output_file, audio_metadata
 
-    # Select the download strategy
+    # Select the download strategy, the episode is streamed straight into the output file
     download_output = downloader.download(
         url,
         Path(TEMP_DIR),
+        Path(output_file),
     )
-    
+    if download_output is None:
+        raise ValueError(f"Failed to download {url}")
+
     logging.info(f"Download completed in {time.time() - start_time:.2f} seconds.")
-    save_to_file(output_file, download_output)
     audio_metadata = get_audio_metadata(output_file)
     logging.info(f"Download saved to {output_file}")
 
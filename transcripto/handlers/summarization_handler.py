@@ -18,11 +18,18 @@ def sanitize_text(text: str) -> str:
     
         return sanitized_text
 
-def process_summarization(text, title, summarizer_engine="openai", summarizer_model="gpt-4o-mini", force=False):
+def process_summarization(text, title, summarizer_engine="openai", summarizer_model="gpt-4o-mini", force=False, variant=None):
+    """
+    Args:
+        variant (str): Cached apart from the regular summary, e.g. 'draft' for a summary of a draft transcript.
+    """
     logging.info(f"Starting summarization {title} using {summarizer_engine}...")
     start_time = time.time()
 
-    base_filename = f"{title}_{summarizer_engine}_{summarizer_model}_summary"
+    if variant:
+        base_filename = f"{title}_{summarizer_engine}_{summarizer_model}_{variant}_summary"
+    else:
+        base_filename = f"{title}_{summarizer_engine}_{summarizer_model}_summary"
     output_file = get_output_file(base_filename, "txt")
 
     if not force and os.path.exists(output_file):
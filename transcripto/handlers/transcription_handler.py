@@ -2,34 +2,223 @@ import os
 import logging
 import time
 from transcripto.services.transcriptors.transcriptor_factory import TranscriptorFactory
+from transcripto.services.transcriptors.transcription_worker_pool import TranscriptionWorkerPool
+from transcripto.services.transcriptors.model_tier_router import ModelTierRouter, AUTO_TIER
+from transcripto.utils.audio import get_audio_duration
+from transcripto.handlers.decode_handler import process_decode
 from transcripto.utils.file import save_to_file, get_output_file
+from transcripto.utils.checkpoint import TranscriptionCheckpoint
+from transcripto.utils.segment_store import SegmentStore
 from transcripto.utils.text import split_text_into_paragraphs
 
+def get_transcript_basename(title, transcript_engine, profile=None, speed=None):
+    """
+    Transcripts of different decoding profiles and time compressions are cached side by side.
+    """
+    variant = f"_{profile}" if profile else ""
+    if speed and speed != 1.0:
+        variant += f"_x{speed:g}"
+
+    return f"{title}_{transcript_engine}{variant}_transcript"
+
+
+def get_segments_file(output_file):
+    return f"{os.path.splitext(output_file)[0]}.segments"
+
+
+def save_transcript(output_file, transcription_output):
+    """
+    Saves the paragraph-split transcript and, next to it, its timestamped segments.
+
+    Returns:
+        str: The formatted transcript.
+    """
+    formatted_text = split_text_into_paragraphs(transcription_output["text"])
+    save_to_file(output_file, formatted_text)
+
+    segments = transcription_output.get("segments")
+    if segments:
+        SegmentStore(get_segments_file(output_file)).write(segments)
+
+    return formatted_text
+
+
+def get_transcript_segments(output_file, start_seconds=0.0, end_seconds=None):
+    """
+    Reads the segments of a saved transcript overlapping a time range.
+
+    Returns:
+        list[dict]: Segments with start, end, text and avg_logprob, empty when the transcript has no segment store.
+    """
+    segments_file = get_segments_file(output_file)
+    if not os.path.exists(segments_file):
+        return []
+
+    return SegmentStore(segments_file).get_segments(start_seconds, end_seconds)
+
+
+def get_cached_transcript(title, transcript_engine, profiles, speed=None):
+    """
+    Returns the first existing transcript among the given profiles, None if there is none.
+    """
+    for profile in profiles:
+        output_file = get_output_file(get_transcript_basename(title, transcript_engine, profile, speed), "txt")
+        if os.path.exists(output_file):
+            logging.info(f"Raw transcription file already exists: {output_file}, using it.")
+            with open(output_file, "r", encoding="utf-8") as f:
+                return f.read()
+
+    return None
+
+
+def route_profile(profile, audio_paths):
+    """
+    Resolves the automatic profile to a model tier, sized for the longest of the episodes.
+
+    Returns:
+        tuple[str, list[str]]: The profile to transcribe with and the profiles whose cached
+            transcripts are good enough, the chosen tier first and then the more accurate ones.
+    """
+    if profile != AUTO_TIER:
+        return profile, [profile]
+
+    longest_duration = max((get_audio_duration(audio_path) for audio_path in audio_paths), default=0.0)
+    tier = ModelTierRouter.choose_tier(longest_duration)
+
+    return tier, ModelTierRouter.get_tiers_at_least(tier)[::-1]
+
+
 def process_transcription(
-        audio_url, temp_dir, title, ext="mp3", transcript_engine="speech_recognition", language="en-US", min_silence_len=1000, silence_thresh=-14, force=False
+        audio_url, temp_dir, title, ext="mp3", transcript_engine="speech_recognition", language=None, min_silence_len=None, silence_thresh=None, force=False, on_segment=None, **engine_options
 ):
+    """
+    Transcribes an episode, or returns its cached transcript.
+
+    Args:
+        min_silence_len (int): Minimum silence length to split audio (ms), for the speech_recognition engine.
+        silence_thresh (int): Silence threshold relative to dBFS, for the speech_recognition engine.
+        on_segment (callable): Called with every segment as soon as it is decoded, for progressive consumers.
+
+    Returns:
+        str: The transcript split into paragraphs.
+    """
     start_time = time.time()
     logging.info(f"Starting transcription using {transcript_engine} model...")
 
-    base_filename = f"{title}_{transcript_engine}_transcript"
+    # explicit silence criteria take precedence over the calibrated ones
+    if min_silence_len is not None:
+        engine_options["min_silence_len"] = min_silence_len
+    if silence_thresh is not None:
+        engine_options["silence_thresh"] = silence_thresh
+
+    # options the engine ignores, such as the speed of speech_recognition, must not name its transcript either
+    engine_options = TranscriptorFactory.get_engine_options(transcript_engine, **engine_options)
+    profile, cache_profiles = route_profile(engine_options.get("profile"), [audio_url])
+    if profile:
+        engine_options["profile"] = profile
+
+    base_filename = get_transcript_basename(title, transcript_engine, profile, engine_options.get("speed"))
     output_file = get_output_file(base_filename, "txt")
 
-    if not force and os.path.exists(output_file):
-        logging.info(f"Raw transcription file already exists: {output_file}, using it.")
-        with open(output_file, "r", encoding="utf-8") as f:
-            return f.read()
+    cached_transcript = None if force else get_cached_transcript(title, transcript_engine, cache_profiles, engine_options.get("speed"))
+    if cached_transcript is not None:
+        return cached_transcript
+
+    # Every engine reads the same decoded PCM, decoding happens at most once per download
+    pcm_path = process_decode(audio_url, title)
 
     # Select the transcriptor strategy
-    transcriptor = TranscriptorFactory.get_transcriptor(transcript_engine)
-    transcription_output = transcriptor.transcribe(audio_url)
-    transcription_output_text = transcription_output["text"]
+    transcriptor = TranscriptorFactory.get_transcriptor(transcript_engine, **engine_options)
+    checkpoint_file = get_output_file(base_filename, "checkpoint.jsonl")
+    if force:
+        TranscriptionCheckpoint(checkpoint_file).clear()
 
-    logging.info(f"Transcription completed in {time.time() - start_time:.2f} seconds.")
+    with ModelTierRouter.track() as load:
+        for segment in transcriptor.iter_transcribe(pcm_path, language=language, checkpoint_path=checkpoint_file):
+            if on_segment:
+                on_segment(segment)
+    transcription_output = transcriptor.last_output
+    ModelTierRouter.record_real_time_factor(profile, transcription_output.get("real_time_factor"), load["average_jobs"])
 
-    formatted_text = split_text_into_paragraphs(transcription_output_text)
-    
-    save_to_file(output_file, formatted_text)
+    logging.info(
+        f"Transcription completed in {time.time() - start_time:.2f} seconds, "
+        f"real-time factor {transcription_output.get('real_time_factor')}."
+    )
+
+    formatted_text = save_transcript(output_file, transcription_output)
+    TranscriptionCheckpoint(checkpoint_file).clear()
 
     logging.info(f"Raw transcription saved to {output_file}")
 
     return formatted_text
+
+
+def process_batch_transcription(
+        episodes, temp_dir, transcript_engine="wisper_batched", language=None, force=False, worker_pool=False, threads_per_worker=None, pool_workers=None, prefork=False, **engine_options
+):
+    """
+    Transcribes several episodes together, engines that support it decode them in shared batches.
+
+    Args:
+        episodes (list[tuple[str, str]]): (title, local audio path) of every episode.
+        worker_pool (bool): Transcribe the episodes in a pool of workers pinned to disjoint cores.
+        threads_per_worker (int): Cores given to every pool worker.
+        pool_workers (int): Number of pool workers, derived from the core count when None.
+        prefork (bool): Load the model once in the parent and fork the pool workers from it.
+
+    Returns:
+        dict: Formatted transcript by episode title.
+    """
+    start_time = time.time()
+    logging.info(f"Starting batch transcription of {len(episodes)} episodes using {transcript_engine} model...")
+
+    engine_options = TranscriptorFactory.get_engine_options(transcript_engine, **engine_options)
+    # the whole batch shares one tier
+    profile, cache_profiles = route_profile(engine_options.get("profile"), [audio_path for _, audio_path in episodes])
+    if profile:
+        engine_options["profile"] = profile
+
+    transcripts = {}
+    pending = []
+    for title, audio_path in episodes:
+        base_filename = get_transcript_basename(title, transcript_engine, profile, engine_options.get("speed"))
+        output_file = get_output_file(base_filename, "txt")
+        cached_transcript = None if force else get_cached_transcript(title, transcript_engine, cache_profiles, engine_options.get("speed"))
+        if cached_transcript is not None:
+            transcripts[title] = cached_transcript
+        else:
+            checkpoint_file = get_output_file(base_filename, "checkpoint.jsonl")
+            if force:
+                TranscriptionCheckpoint(checkpoint_file).clear()
+            pending.append((title, process_decode(audio_path, title), output_file, checkpoint_file))
+
+    if not pending:
+        return transcripts
+
+    # jobs routed while the batch runs see every pending episode as load
+    with ModelTierRouter.track(len(pending)):
+        if worker_pool:
+            pool_options = {"threads_per_worker": threads_per_worker} if threads_per_worker else {}
+            pool = TranscriptionWorkerPool(transcript_engine, workers=pool_workers, prefork=prefork, engine_options=engine_options, **pool_options)
+            jobs = [(pcm_path, checkpoint_file) for _, pcm_path, _, checkpoint_file in pending]
+            transcription_outputs = pool.transcribe(jobs, language=language)
+        else:
+            transcriptor = TranscriptorFactory.get_transcriptor(transcript_engine, **engine_options)
+            pcm_paths = [pcm_path for _, pcm_path, _, _ in pending]
+            if hasattr(transcriptor, "transcribe_batch"):
+                transcription_outputs = transcriptor.transcribe_batch(pcm_paths, language=language)
+            else:
+                transcription_outputs = [
+                    transcriptor.transcribe(pcm_path, language=language, checkpoint_path=checkpoint_file)
+                    for _, pcm_path, _, checkpoint_file in pending
+                ]
+
+    for (title, _, output_file, checkpoint_file), transcription_output in zip(pending, transcription_outputs):
+        formatted_text = save_transcript(output_file, transcription_output)
+        TranscriptionCheckpoint(checkpoint_file).clear()
+        logging.info(f"Raw transcription saved to {output_file}")
+        transcripts[title] = formatted_text
+
+    logging.info(f"Batch transcription of {len(pending)} episodes completed in {time.time() - start_time:.2f} seconds.")
+
+    return transcripts
@@ -24,7 +24,7 @@ class ApplePodcastDownload(DownloadBase):
         return url_parts.episode_id
 
 
-    def download(self, url: str, temp_path: Path):
+    def download(self, url: str, temp_path: Path, output_path: Path):
         logging.info(f"ApplePodcastDownload starting download {url}...")
 
         try:
@@ -38,8 +38,7 @@ class ApplePodcastDownload(DownloadBase):
                     "referer": self.APPLE_PODCASTS_HOME_PAGE_URL,
                     "origin": self.APPLE_PODCASTS_HOME_PAGE_URL,
                 }
-                mp3_content = self.url_downloader.download(episode_audio_url, temp_path, headers=audio_headers)
-                return mp3_content
+                return self.url_downloader.download(episode_audio_url, temp_path, output_path, headers=audio_headers)
             else:
                 logging.error(f"Episode failed to detect a valid url: {episode_audio_url} from this podcast: {url}")
                 return None
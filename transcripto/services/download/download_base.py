@@ -1,3 +1,6 @@
+import os
+import shutil
+import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -8,5 +11,58 @@ class DownloadBase(ABC):
 
 
     @abstractmethod
-    def download(self, url: str, temp_path: Path):
+    def download(self, url: str, temp_path: Path, output_path: Path) -> Path:
+        """
+        Downloads the episode into `output_path`, the file only appears there once complete.
+
+        Args:
+            url (str): Episode URL.
+            temp_path (Path): Directory for intermediate files.
+            output_path (Path): Path of the downloaded artifact.
+
+        Returns:
+            Path: `output_path`, None when the episode could not be downloaded.
+        """
         pass
+
+
+    @staticmethod
+    def get_partial_path(output_path: Path) -> Path:
+        return Path(f"{output_path}.part")
+
+
+    def write_stream(self, chunks, output_path: Path) -> Path:
+        """
+        Writes an iterable of byte chunks into a partial file next to `output_path` and
+        renames it into place once complete, only one chunk is held in memory at a time.
+        """
+        partial_path = self.get_partial_path(output_path)
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with open(partial_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(partial_path, output_path)
+        logging.debug(f"Saved download to {output_path}")
+
+        return output_path
+
+
+    def move_to_output(self, source_path: Path, output_path: Path) -> Path:
+        """
+        Moves a file a downloader produced in its temp directory into place. The file is first
+        moved next to `output_path`, possibly copying across file systems, then renamed atomically.
+        """
+        partial_path = self.get_partial_path(output_path)
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+
+        shutil.move(source_path, partial_path)
+        os.replace(partial_path, output_path)
+        logging.debug(f"Moved {source_path} to {output_path}")
+
+        return output_path
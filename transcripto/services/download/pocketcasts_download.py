@@ -9,10 +9,12 @@ from pathlib import Path
 
 class PocketCastsDownload(DownloadBase):
     provider = {}
+    url_downloader = {}
 
 
     def __init__(self):
         self.provider = PocketCastsAPI()
+        self.url_downloader = URLDownload()
 
 
     def get_episode_id(self, url):
@@ -21,19 +23,16 @@ class PocketCastsDownload(DownloadBase):
         return url_parts.id
     
 
-    def download(self, url: str, temp_path: Path):
+    def download(self, url: str, temp_path: Path, output_path: Path):
         logging.info(f"PocketCastsDownload starting download {url}...")
 
         try:
             episode_metadata = self.provider.get_episode_metadata(url)
             episode_audio_url = episode_metadata.episode_audio_url
             
-            url_downloader = URLDownload()
-            
             if is_valid_url(episode_audio_url):
                 logging.info(f"Detected a url for a podcast episode {episode_audio_url}, Offloading to URLDownload")
-                mp3_content = url_downloader.download(episode_audio_url, temp_path)
-                return mp3_content
+                return self.url_downloader.download(episode_audio_url, temp_path, output_path)
             else:
                 logging.error(f"MP3 path could not be deleted from this podcast: {url}")
                 return None
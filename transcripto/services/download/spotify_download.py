@@ -1,5 +1,4 @@
 import logging
-import io
 import os
 from dataclasses import dataclass
 import shutil
@@ -48,10 +47,7 @@ class SpotifyDownload(DownloadBase):
             shutil.rmtree(self.temp_path)
     
 
-    def download(self, url: str, temp_path: Path):
-        # Create an in-memory buffer
-        buffer = io.BytesIO()
-
+    def download(self, url: str, temp_path: Path, output_path: Path):
         self.temp_path = temp_path
         self.__remove_temp_path()
         
@@ -70,18 +66,10 @@ class SpotifyDownload(DownloadBase):
         decrpytion_key = self.DECRYPTION_KEY_EPISODE.hex()
         self.decrypt(decrpytion_key, temp_file_encrypted, temp_file_decrypted)
 
-        # Read the file into the buffer
-        with open(temp_file_decrypted, 'rb') as f:
-            buffer.write(f.read())
-
-        # Delete the temporary file
+        # Move the decrypted file into place instead of reading it into memory
         os.remove(temp_file_encrypted)
-        os.remove(temp_file_decrypted)
 
-        buffer.seek(0)
-        mp3_bytes = buffer.read()
-        
-        return mp3_bytes
+        return self.move_to_output(temp_file_decrypted, output_path)
 
 
     def __get_temp_filepath(self, episode_id: str, encryption_state: str, file_extension: str) -> Path:
@@ -1,11 +1,11 @@
 import re
 import logging
-import requests
 from .download_base import DownloadBase
+from transcripto.utils.http import HTTPClientRegistry
 from transcripto.utils.file import extract_filename_from_url
 from pathlib import Path
 from urllib.parse import urlparse
-from config import DOAMINS_TEXT_SELECTORS
+from config import DOAMINS_TEXT_SELECTORS, DOWNLOAD_CHUNK_SIZE
 
 class TextDownload(DownloadBase):
     TEXT_SUPPORTED_DOMAINS = '|'.join(map(re.escape, DOAMINS_TEXT_SELECTORS.keys()))
@@ -17,8 +17,7 @@ class TextDownload(DownloadBase):
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = HTTPClientRegistry.get_session("text_download", {
             "accept": "*/*",
             "accept-language": "en-US",
             "referer": self.DEFAULT_REFERER,
@@ -26,11 +25,12 @@ class TextDownload(DownloadBase):
         })
 
 
-    def __apply_http_properties(self, referer: str, user_agent: str):
-        self.session.headers.update({
+    def __get_http_properties(self, referer: str, user_agent: str):
+        # per request headers, the session is shared with other downloads
+        return {
             "referer": referer,
             "user-agent": user_agent,
-        })
+        }
     
 
     def get_episode_id(self, url):
@@ -39,7 +39,7 @@ class TextDownload(DownloadBase):
         return episode_id
 
 
-    def download(self, url: str, temp_path: Path):
+    def download(self, url: str, temp_path: Path, output_path: Path):
         logging.info(f"TextDownload Starting download {url}...")
 
         try:
@@ -50,12 +50,13 @@ class TextDownload(DownloadBase):
             user_agent = config.get("properties", {}).get("http", {}).get("user_agent", self.DEFAULT_USER_AGENT) or self.DEFAULT_USER_AGENT
             print(referer)
             print(user_agent)
-            self.__apply_http_properties(referer, user_agent)
-            response = self.session.get(url, stream = True)
-            response.raise_for_status()
+            http_properties = self.__get_http_properties(referer, user_agent)
+            with self.session.get(url, stream = True, headers = http_properties) as response:
+                response.raise_for_status()
+                self.write_stream(response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), output_path)
             logging.info(f"Download completed: {url}")
 
-            return response.content
+            return output_path
 
         except Exception as e:
             logging.error(f"An error occurred: {e}")
@@ -1,18 +1,30 @@
+import os
+import re
 import logging
+import threading
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from config import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_MAX_RESUMES, DOWNLOAD_TIMEOUT_SECONDS, DOWNLOAD_SEGMENTS, DOWNLOAD_MIN_SEGMENT_SIZE
 from .download_base import DownloadBase
+from transcripto.utils.http import HTTPClientRegistry
 from transcripto.utils.file import extract_filename_from_url
 
 class URLDownload(DownloadBase):
 
-    def __init__(self):
+    def __init__(self, segments=DOWNLOAD_SEGMENTS, max_resumes=DOWNLOAD_MAX_RESUMES):
+        """
+        Args:
+            segments (int): Ranges fetched concurrently when the server accepts them, 1 downloads in a single stream.
+            max_resumes (int): Times an interrupted transfer is resumed before giving up.
+        """
+        self.segments = segments
+        self.max_resumes = max_resumes
         self.__apply_requests_session()
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = HTTPClientRegistry.get_session("url_download", {
             "accept": "*/*",
             "accept-language": "en-US",
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
@@ -24,7 +36,7 @@ class URLDownload(DownloadBase):
         return filename
 
 
-    def download(self, url: str, temp_path: Path, headers: dict = None):
+    def download(self, url: str, temp_path: Path, output_path: Path, headers: dict = None):
         logging.info(f"URLDownload Starting download {url}...")
 
         # local path handler, move elsewhere?
@@ -36,12 +48,225 @@ class URLDownload(DownloadBase):
         logging.info(f"Downloading file from URL: {url}")
 
         try:
-            response = self.session.get(url, stream=True, headers=headers)
-            response.raise_for_status()
+            if self.segments > 1:
+                segmented_output = self.__download_segmented(url, output_path, headers)
+                if segmented_output:
+                    logging.info(f"Download completed: {url}")
+                    return segmented_output
+
+            self.__download_resumable(url, output_path, headers)
             logging.info(f"Download completed: {url}")
 
-            return response.content
+            return output_path
         
         except requests.RequestException as e:
             logging.error(f"Failed to download file: {e}")
             raise
+
+
+    def __download_resumable(self, url, output_path, headers):
+        """
+        Streams the file into its partial path. A connection dropped mid-transfer, in this run
+        or a previous one, resumes from the end of the partial file with a Range request.
+
+        The validator of the response that started the partial file is kept next to it and sent
+        as If-Range, a file changed since then, e.g. by dynamic ad insertion, comes back whole
+        instead of being spliced onto the old bytes.
+        """
+        partial_path = self.get_partial_path(output_path)
+        validator_path = self.__get_validator_path(partial_path)
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+
+        for attempt in range(self.max_resumes + 1):
+            offset = partial_path.stat().st_size if partial_path.exists() else 0
+            validator = validator_path.read_text(encoding="utf-8") if offset and validator_path.exists() else None
+            if offset and not validator:
+                logging.warning(f"Partial download of {url} cannot be checked against the remote file, starting over")
+                partial_path.unlink()
+                offset = 0
+
+            request_headers = dict(headers or {})
+            if offset:
+                # ranges count raw bytes, a transparently decompressed body would not line up
+                request_headers.update({"range": f"bytes={offset}-", "if-range": validator, "accept-encoding": "identity"})
+                logging.info(f"Resuming download of {url} from byte {offset}")
+
+            try:
+                with self.session.get(url, stream=True, headers=request_headers, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+                    if offset and response.status_code == 416:
+                        if self.__get_range_size(response) == offset:
+                            # the partial file already holds the whole body
+                            break
+                        logging.warning(f"Partial download of {url} does not match the remote file, starting over")
+                        partial_path.unlink(missing_ok=True)
+                        continue
+                    response.raise_for_status()
+
+                    resumed = offset and response.status_code == 206
+                    if resumed and self.__get_range_start(response) != offset:
+                        logging.warning(f"Server resumed {url} at another byte than {offset}, starting over")
+                        partial_path.unlink(missing_ok=True)
+                        continue
+
+                    # a changed file or a server ignoring the range sends the whole body again
+                    if not resumed:
+                        self.__save_validator(validator_path, response)
+                    with open(partial_path, "ab" if resumed else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == self.max_resumes:
+                    raise
+                logging.warning(f"Download of {url} interrupted ({e}), resuming ({attempt + 1}/{self.max_resumes})")
+        else:
+            raise requests.RequestException(f"Download of {url} did not complete after {self.max_resumes} resumes")
+
+        os.replace(partial_path, output_path)
+        validator_path.unlink(missing_ok=True)
+
+
+    def __download_segmented(self, url, output_path, headers):
+        """
+        Fetches the file in concurrent ranges written in place into a preallocated partial file.
+        The partial file is removed when any range fails, its gaps would otherwise pass for data.
+        Every range is sent with the validator of the probe as If-Range, so a file changing
+        mid-download is not assembled from two versions.
+
+        Returns:
+            Path: `output_path`, None when the server does not serve validated ranges or the file is too small to split.
+        """
+        probe_headers = {**(headers or {}), "range": "bytes=0-0", "accept-encoding": "identity"}
+        with self.session.get(url, stream=True, headers=probe_headers, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+            response.raise_for_status()
+            size = self.__get_range_size(response) if response.status_code == 206 else None
+            validator = self.__get_validator(response)
+
+        segments = min(self.segments, (size or 0) // DOWNLOAD_MIN_SEGMENT_SIZE)
+        if segments < 2 or not validator:
+            logging.info(f"Server does not serve validated ranges for {url} or the file is too small, using a single stream")
+            return None
+
+        partial_path = self.get_partial_path(output_path)
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial_path, "wb") as f:
+            f.truncate(size)
+
+        boundaries = [size * index // segments for index in range(segments + 1)]
+        logging.info(f"Downloading {size} bytes of {url} in {segments} ranges")
+
+        cancelled = threading.Event()
+        try:
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+                futures = [
+                    executor.submit(self.__download_range, url, partial_path, start, end - 1, validator, headers, cancelled)
+                    for start, end in zip(boundaries, boundaries[1:])
+                ]
+                try:
+                    completed = all([future.result() for future in futures])
+                except BaseException:
+                    cancelled.set()
+                    raise
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        if not completed:
+            partial_path.unlink(missing_ok=True)
+            logging.warning(f"Server answered a range of {url} with the whole file or another range, using a single stream")
+            return None
+
+        os.replace(partial_path, output_path)
+
+        return output_path
+
+
+    def __download_range(self, url, partial_path, first_byte, last_byte, validator, headers, cancelled):
+        """
+        Returns:
+            bool: True once the range is written, False when the server ignored the range, the file
+                changed or another range failed.
+        """
+        position = first_byte
+
+        for attempt in range(self.max_resumes + 1):
+            request_headers = {
+                **(headers or {}),
+                "range": f"bytes={position}-{last_byte}",
+                "if-range": validator,
+                "accept-encoding": "identity",
+            }
+            try:
+                with self.session.get(url, stream=True, headers=request_headers, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206 or self.__get_range_start(response) != position:
+                        cancelled.set()
+                        return False
+
+                    with open(partial_path, "r+b") as f:
+                        f.seek(position)
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            if cancelled.is_set():
+                                return False
+                            f.write(chunk[:last_byte + 1 - position])
+                            position += len(chunk)
+                            if position > last_byte:
+                                break
+
+                if position > last_byte:
+                    return True
+                raise requests.exceptions.ChunkedEncodingError(f"Range ended at byte {position} of {last_byte + 1}")
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == self.max_resumes or cancelled.is_set():
+                    raise
+                logging.warning(f"Range {first_byte}-{last_byte} interrupted at byte {position} ({e}), resuming")
+
+
+    @staticmethod
+    def __get_validator(response):
+        """
+        Returns:
+            str: The strong ETag of the response, else its Last-Modified date, None when it has neither.
+        """
+        etag = response.headers.get("etag")
+        # If-Range only accepts strong validators
+        if etag and not etag.startswith("W/"):
+            return etag
+
+        return response.headers.get("last-modified")
+
+
+    @classmethod
+    def __save_validator(cls, validator_path, response):
+        validator = cls.__get_validator(response)
+        if validator:
+            validator_path.write_text(validator, encoding="utf-8")
+        else:
+            validator_path.unlink(missing_ok=True)
+
+
+    @staticmethod
+    def __get_validator_path(partial_path):
+        return Path(f"{partial_path}.validator")
+
+
+    @staticmethod
+    def __get_range_start(response):
+        """
+        Returns:
+            int: First byte of a `Content-Range: bytes first-last/size` header, None when missing.
+        """
+        match = re.match(r"bytes (\d+)-", response.headers.get("content-range", ""))
+
+        return int(match.group(1)) if match else None
+
+
+    @staticmethod
+    def __get_range_size(response):
+        """
+        Returns:
+            int: Full size of the file from a `Content-Range: bytes .../size` header, None when unknown.
+        """
+        _, _, size = response.headers.get("content-range", "").rpartition("/")
+
+        return int(size) if size.isdigit() else None
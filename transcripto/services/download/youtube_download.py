@@ -1,5 +1,4 @@
 import logging
-import io
 import re
 import os
 import yt_dlp
@@ -21,7 +20,7 @@ class YoutubeDownload(DownloadBase):
         return url_parts.id
 
 
-    def download(self, url: str, temp_path: Path):
+    def download(self, url: str, temp_path: Path, output_path: Path):
         output_directory = temp_path
         output_filename_format = '%(id)s - %(title)s (%(uploader)s) (%(id)s) (%(upload_date)s).%(ext)s'
 
@@ -29,9 +28,6 @@ class YoutubeDownload(DownloadBase):
             episode_metadata = self.provider.get_episode_metadata(url)
             episode_audio_url = episode_metadata.episode_audio_url
 
-            # Create an in-memory buffer
-            buffer = io.BytesIO()
-
             # Configure yt_dlp options
             ydl_opts = {
                 'format': 'bestaudio/best',
@@ -52,17 +48,8 @@ class YoutubeDownload(DownloadBase):
 
             logging.info("Download and conversion completed successfully.")
 
-            # Read the file into the buffer
-            with open(file_path, 'rb') as f:
-                buffer.write(f.read())
-
-            # Delete the temporary file
-            os.remove(file_path)
-
-            buffer.seek(0)  # Reset buffer pointer
-            mp3_bytes = buffer.read()  # Return the binary MP3 content
-            
-            return mp3_bytes
+            # Move the converted file into place instead of reading it into memory
+            return self.move_to_output(file_path, output_path)
 
         except Exception as e:
             logging.error(f"An error occurred: {e}")
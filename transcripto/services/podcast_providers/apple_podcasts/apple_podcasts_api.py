@@ -1,7 +1,7 @@
 import logging
 import requests
 from urllib.parse import urlparse, parse_qs
-from transcripto.utils.http import verify_response
+from transcripto.utils.http import verify_response, HTTPClientRegistry
 from transcripto.utils.json import match_patterns
 from .models import ApplePodcastsURL, ApplePodcastsDownloadItem
 
@@ -14,8 +14,7 @@ class ApplePodcastsAPI:
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = HTTPClientRegistry.get_session("apple_podcasts", {
             "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "accept-encoding": "gzip, deflate, br",
             "accept-language": "en-US,en;q=0.9",
@@ -1,7 +1,7 @@
 import logging
 import requests
 from transcripto.utils.file import extract_filename_from_url
-from transcripto.utils.http import verify_response
+from transcripto.utils.http import verify_response, HTTPClientRegistry
 from transcripto.utils.json import match_patterns
 from transcripto.utils.text import strip_html_tags
 from .models import PocketCastsURL, PocketCastsDownloadItem
@@ -16,8 +16,7 @@ class PocketCastsAPI:
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = HTTPClientRegistry.get_session("pocketcasts", {
             "accept": "text/html",
             "accept-language": "en-US",
             "origin": self.POCKETCASTS_HOME_PAGE_URL,
@@ -1,9 +1,8 @@
 import re
 import json
 import time
-import requests
 from syrics.totp import TOTP
-from transcripto.utils.http import verify_response
+from transcripto.utils.http import verify_response, HTTPClientRegistry
 from .models import SpotifyURL, SpotifyDownloadItem
 from transcripto.exceptions import TOTPGenerationException
 
@@ -39,8 +38,7 @@ class SpotifyAPI:
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
+        self.session = HTTPClientRegistry.get_session("spotify", self.HEADERS)
         self.__get_access_token()
 
 
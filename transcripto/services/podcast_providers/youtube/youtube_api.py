@@ -2,7 +2,7 @@ import re
 import json
 import logging
 import requests
-from transcripto.utils.http import verify_response
+from transcripto.utils.http import verify_response, HTTPClientRegistry
 from .models import YoutubeURL, YoutubeDownloadItem
 
 class YoutubeAPI:
@@ -14,8 +14,7 @@ class YoutubeAPI:
 
 
     def __apply_requests_session(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = HTTPClientRegistry.get_session("youtube", {
             "accept": "text/html",
             "accept-language": "en-US",
             "origin": self.YOUTUBE_HOME_PAGE_URL,
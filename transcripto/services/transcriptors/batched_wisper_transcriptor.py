@@ -0,0 +1,227 @@
+import time
+import logging
+from collections import deque
+import numpy as np
+import torch
+import whisper
+from whisper.tokenizer import get_tokenizer
+from tqdm import tqdm
+from config import WHISPER_BATCH_SIZE, WHISPER_TIME_COMPRESSION
+from transcripto.utils.audio import iter_pcm_blocks, get_audio_duration, get_time_compressed_file, SAMPLE_RATE
+from .wisper_transcriptor import WhisperTranscriptor
+from .whisper_model_registry import WhisperModelRegistry
+from .whisper_languages import to_whisper_language
+
+
+class _EpisodeStream:
+    """
+    Decoding state of one episode inside a batch: its pending audio and the segments decoded so far.
+    """
+
+    def __init__(self, index, audio_path, transcription_path, language, window_seconds):
+        self.index = index
+        self.audio_path = audio_path
+        self.language = language
+        self.segments = []
+        self.start_time = time.time()
+
+        self.window_samples = window_seconds * SAMPLE_RATE
+        self.blocks = iter_pcm_blocks(transcription_path, window_seconds)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0
+        self.exhausted = False
+
+
+    def next_window(self):
+        """
+        Returns:
+            tuple[np.ndarray, bool]: The next window and whether it is the last one, None when the episode is done.
+        """
+        while not self.exhausted and len(self.buffer) < self.window_samples:
+            block = next(self.blocks, None)
+            if block is None:
+                self.exhausted = True
+            else:
+                self.buffer = np.concatenate([self.buffer, block])
+
+        if len(self.buffer) == 0:
+            return None
+
+        is_last = self.exhausted and len(self.buffer) <= self.window_samples
+
+        return self.buffer[:self.window_samples], is_last
+
+
+    def advance(self, consumed):
+        self.buffer = self.buffer[consumed:]
+        self.buffer_offset += consumed
+
+
+class BatchedWhisperTranscriptor(WhisperTranscriptor):
+    """
+    Transcribes several episodes at once, the next 30 second window of every queued episode
+    is packed into a single encoder/decoder batch and the results are routed back per episode.
+
+    Windows are decoded without the previous text as prompt, windows that fail the
+    Whisper quality thresholds are decoded again alone with the temperature fallback.
+    A single file is transcribed with the regular windowed path.
+    """
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    LOGPROB_THRESHOLD = -1.0
+    NO_SPEECH_THRESHOLD = 0.6
+    TIME_PRECISION = 0.02
+
+    def __init__(self, model_name=None, device=None, dtype=None, batch_size=WHISPER_BATCH_SIZE, profile=None, speed=WHISPER_TIME_COMPRESSION):
+        super().__init__(model_name, device, dtype, streaming=True, profile=profile, speed=speed)
+        self.batch_size = max(1, batch_size)
+
+
+    def transcribe_batch(self, audio_paths, language=None):
+        """
+        Transcribes a list of audio files in shared batches.
+
+        Args:
+            audio_paths (list[str]): Paths to the PCM artifacts or audio files.
+            language (str): BCP-47 language tag, detected once per episode when None.
+
+        Returns:
+            list[dict]: One transcription result per audio file, in the same order.
+        """
+        model = WhisperModelRegistry.get_model(self.model_name, self.device, self.dtype)
+        language = to_whisper_language(language)
+
+        pending = deque(enumerate(audio_paths))
+        active = []
+        results = [None] * len(audio_paths)
+
+        logging.info(f"Transcribing {len(audio_paths)} episodes in batches of {self.batch_size}...")
+        with tqdm(desc="Transcribing", unit="episode", total=len(audio_paths)) as progress:
+            while pending or active:
+                while pending and len(active) < self.batch_size:
+                    index, audio_path = pending.popleft()
+                    transcription_path = get_time_compressed_file(audio_path, self.speed) if self.speed != 1.0 else audio_path
+                    episode_language = language or self.detect_language(model, transcription_path)
+                    active.append(_EpisodeStream(index, audio_path, transcription_path, episode_language, self.WINDOW_SECONDS))
+
+                batches = {}
+                for stream in list(active):
+                    window = stream.next_window()
+                    if window is None:
+                        results[stream.index] = self.__get_result(stream)
+                        active.remove(stream)
+                        progress.update(1)
+                    else:
+                        batches.setdefault(stream.language, []).append((stream, *window))
+
+                # a decode call takes a single language, episodes of another language go in their own batch
+                for batch_language, batch in batches.items():
+                    self.__decode_batch(model, batch_language, batch)
+
+        return results
+
+
+    def __get_result(self, stream):
+        elapsed = time.time() - stream.start_time
+        audio_duration = get_audio_duration(stream.audio_path)
+        real_time_factor = round(elapsed / audio_duration, 4) if audio_duration else None
+        logging.info(f"Transcription complete for {stream.audio_path}! Real-time factor {real_time_factor} ({self.profile or 'default'} profile)")
+
+        return {
+            "text": "".join(segment["text"] for segment in stream.segments),
+            "detected_language": stream.language,
+            "duration_seconds": f"{elapsed:.2f}",
+            "real_time_factor": real_time_factor,
+            "skipped_ratio": 0.0,
+            "segments": [self.rescale_segment(segment, self.speed) for segment in stream.segments],
+        }
+
+
+    def __decode_batch(self, model, language, batch):
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels)
+            for _, window, _ in batch
+        ]).to(model.device)
+
+        options = whisper.DecodingOptions(
+            language=language,
+            without_timestamps=False,
+            beam_size=self.decode_options.get("beam_size"),
+            fp16=model.device.type == "cuda",
+        )
+        temperatures = self.decode_options.get("temperature", (0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
+        can_fallback = isinstance(temperatures, (list, tuple)) and len(temperatures) > 1
+        decode_lock = WhisperModelRegistry.decode_lock(self.model_name, self.device, self.dtype)
+        with decode_lock:
+            decoded = whisper.decode(model, mel, options)
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe")
+
+        for (stream, window, is_last), result in zip(batch, decoded):
+            window_seconds = len(window) / SAMPLE_RATE
+
+            if result.no_speech_prob > self.NO_SPEECH_THRESHOLD and result.avg_logprob < self.LOGPROB_THRESHOLD:
+                window_segments = []
+            elif can_fallback and (result.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < self.LOGPROB_THRESHOLD):
+                logging.debug(f"Window at {stream.buffer_offset / SAMPLE_RATE:.2f}s of {stream.audio_path} failed the batch decode, retrying alone")
+                with decode_lock:
+                    window_segments = model.transcribe(
+                        window, verbose=None, language=language, fp16=model.device.type == "cuda", **self.decode_options
+                    )["segments"]
+            else:
+                window_segments = self.__split_segments(tokenizer, result.tokens, result.avg_logprob, window_seconds)
+
+            # keep the tail segment for the next window unless it is the only one or the audio ends here
+            consumed = len(window)
+            if not is_last and len(window_segments) > 1:
+                carry_from = int(window_segments[-1]["start"] * SAMPLE_RATE)
+                if 0 < carry_from < len(window):
+                    consumed = carry_from
+                    window_segments = window_segments[:-1]
+
+            offset_seconds = stream.buffer_offset / SAMPLE_RATE
+            stream.segments.extend(
+                {
+                    "start": segment["start"] + offset_seconds,
+                    "end": segment["end"] + offset_seconds,
+                    "text": segment["text"],
+                    "avg_logprob": segment["avg_logprob"],
+                }
+                for segment in window_segments
+            )
+            stream.advance(consumed)
+
+
+    def __split_segments(self, tokenizer, tokens, avg_logprob, window_seconds):
+        """
+        Splits the decoded tokens of a window into segments at its timestamp tokens.
+        """
+        segments = []
+        start = None
+        text_tokens = []
+
+        for token in tokens:
+            if token < tokenizer.timestamp_begin:
+                text_tokens.append(token)
+                continue
+
+            timestamp = (token - tokenizer.timestamp_begin) * self.TIME_PRECISION
+            if start is not None and text_tokens:
+                segments.append({
+                    "start": start,
+                    "end": min(timestamp, window_seconds),
+                    "text": tokenizer.decode(text_tokens),
+                    "avg_logprob": avg_logprob,
+                })
+                start, text_tokens = None, []
+            else:
+                start = timestamp
+
+        # text cut by the end of the window, without a closing timestamp
+        if text_tokens:
+            segments.append({
+                "start": start or 0.0,
+                "end": window_seconds,
+                "text": tokenizer.decode(text_tokens),
+                "avg_logprob": avg_logprob,
+            })
+
+        return segments
@@ -0,0 +1,145 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from config import WHISPER_MODEL_TIERS, WHISPER_LATENCY_TARGET_SECONDS
+
+# profile name asking the router to pick the tier
+AUTO_TIER = "auto"
+
+
+class ModelTierRouter:
+    """
+    Picks the decoding profile of every transcription job from the episode duration, the
+    number of jobs already running in the process and a latency target.
+
+    Jobs running side by side share the same cores, so the expected latency of a job is its
+    duration times the real-time factor of the tier, times the number of jobs in flight.
+    The most accurate tier expected to finish within the target wins, the fastest tier is
+    used when none does. Real-time factors start from the configured estimates and follow
+    the ones measured on completed jobs, divided by the average number of jobs in flight while
+    they ran, so the contention is not counted once in the estimate and again in the queue depth.
+
+    Only jobs tracked in this process count towards the queue depth. A batch counts all of
+    its pending episodes, including those handed to a worker pool, but transcriptions run by
+    other processes sharing the machine are not seen.
+    """
+    latency_target_seconds = WHISPER_LATENCY_TARGET_SECONDS
+    smoothing = 0.3
+
+    _real_time_factors = dict(WHISPER_MODEL_TIERS)
+    _in_flight = 0
+    # jobs in flight integrated over time, the average load of a job comes out of two readings
+    _load_seconds = 0.0
+    _load_updated_at = time.monotonic()
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def get_tiers(cls):
+        """
+        Returns:
+            list[str]: Tier profiles, most accurate first.
+        """
+        return list(WHISPER_MODEL_TIERS)
+
+
+    @classmethod
+    def get_tiers_at_least(cls, tier):
+        """
+        Returns:
+            list[str]: `tier` and the tiers more accurate than it, most accurate first.
+        """
+        tiers = cls.get_tiers()
+
+        return tiers[:tiers.index(tier) + 1]
+
+
+    @classmethod
+    def choose_tier(cls, duration_seconds):
+        """
+        Args:
+            duration_seconds (float): Episode duration.
+
+        Returns:
+            str: Profile name of the chosen tier.
+        """
+        with cls._lock:
+            queue_depth = cls._in_flight
+            real_time_factors = dict(cls._real_time_factors)
+
+        tiers = cls.get_tiers()
+        chosen_tier = tiers[-1]
+        for tier in tiers:
+            expected_latency = duration_seconds * real_time_factors[tier] * (queue_depth + 1)
+            if expected_latency <= cls.latency_target_seconds:
+                chosen_tier = tier
+                break
+
+        expected_latency = duration_seconds * real_time_factors[chosen_tier] * (queue_depth + 1)
+        logging.info(
+            f"Routing {duration_seconds:.0f}s episode to the {chosen_tier} tier with {queue_depth} jobs in flight, "
+            f"expected {expected_latency:.0f}s for a {cls.latency_target_seconds:.0f}s target"
+        )
+
+        return chosen_tier
+
+
+    @classmethod
+    def record_real_time_factor(cls, tier, real_time_factor, average_jobs=1.0):
+        """
+        Folds the real-time factor measured on a completed job into the estimate of its tier.
+
+        Args:
+            average_jobs (float): Jobs in flight on average while the job ran, itself included.
+        """
+        if tier not in WHISPER_MODEL_TIERS or not real_time_factor:
+            return
+
+        # the estimate is for a job running alone, choose_tier scales it by the load
+        real_time_factor /= max(1.0, average_jobs or 1.0)
+
+        with cls._lock:
+            previous = cls._real_time_factors[tier]
+            cls._real_time_factors[tier] = previous + cls.smoothing * (real_time_factor - previous)
+
+        logging.debug(f"Real-time factor of the {tier} tier updated to {cls._real_time_factors[tier]:.3f}")
+
+
+    @classmethod
+    @contextmanager
+    def track(cls, jobs=1):
+        """
+        Counts jobs as in flight for the duration of the block.
+
+        Args:
+            jobs (int): Jobs the block runs, every episode of a batch or worker pool counts.
+
+        Yields:
+            dict: Filled with `average_jobs`, the jobs in flight on average during the block, once it exits.
+        """
+        load = {"average_jobs": None}
+        with cls._lock:
+            cls._advance_load()
+            start_load_seconds, start_time = cls._load_seconds, cls._load_updated_at
+            cls._in_flight += jobs
+        try:
+            yield load
+        finally:
+            with cls._lock:
+                cls._advance_load()
+                end_load_seconds, end_time = cls._load_seconds, cls._load_updated_at
+                cls._in_flight -= jobs
+
+            elapsed = end_time - start_time
+            load["average_jobs"] = (end_load_seconds - start_load_seconds) / elapsed if elapsed > 0 else float(jobs)
+
+
+    @classmethod
+    def _advance_load(cls):
+        """
+        Integrates the jobs in flight up to now, the caller holds the lock.
+        """
+        now = time.monotonic()
+        cls._load_seconds += cls._in_flight * (now - cls._load_updated_at)
+        cls._load_updated_at = now
@@ -0,0 +1,125 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import torch
+from config import WHISPER_PARALLEL_WORKERS, WHISPER_TIME_COMPRESSION
+from transcripto.utils.audio import compute_frame_loudness, find_silence_split_points
+from transcripto.utils.text import remove_overlapping_prefix
+from transcripto.utils.checkpoint import TranscriptionCheckpoint
+from .wisper_transcriptor import WhisperTranscriptor
+from .whisper_model_registry import WhisperModelRegistry
+
+
+def _init_worker(model_name, device, dtype, threads):
+    # Split the cores between the workers instead of letting every torch instance claim all of them
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    WhisperModelRegistry.get_model(model_name, device, dtype)
+
+
+def _detect_language(model_name, device, dtype, audio_path):
+    transcriptor = WhisperTranscriptor(model_name, device, dtype, streaming=True)
+    model = WhisperModelRegistry.get_model(model_name, device, dtype)
+
+    return transcriptor.detect_language(model, audio_path)
+
+
+def _transcribe_segment(model_name, device, dtype, profile, audio_path, start_seconds, duration_seconds, checkpoint_path, language):
+    transcriptor = WhisperTranscriptor(model_name, device, dtype, streaming=True, profile=profile)
+    model = WhisperModelRegistry.get_model(model_name, device, dtype)
+    checkpoint = TranscriptionCheckpoint(checkpoint_path) if checkpoint_path else None
+
+    segments, result = transcriptor.collect(
+        transcriptor.transcribe_windowed(model, audio_path, start_seconds, duration_seconds, checkpoint, language=language)
+    )
+
+    return segments, result["language"]
+
+
+class ParallelWhisperTranscriptor(WhisperTranscriptor):
+    """
+    Transcribes a single episode with several worker processes, each holding its own model.
+
+    The audio is cut at silence boundaries into one segment per worker, every segment also
+    covers the last seconds of the previous one, and the repeated text is removed when the
+    segment transcripts are stitched back in order.
+    Every segment keeps its own checkpoint, so a resumed run only redoes unfinished segments.
+    """
+    FRAME_SECONDS = 0.1
+    OVERLAP_SECONDS = 2
+    MIN_SEGMENT_SECONDS = 60
+
+    def __init__(self, model_name=None, device="cpu", dtype=None, workers=WHISPER_PARALLEL_WORKERS, profile=None, speed=WHISPER_TIME_COMPRESSION):
+        super().__init__(model_name, device, dtype, streaming=True, profile=profile, speed=speed)
+        self.workers = max(1, workers)
+
+
+    def run_transcription(self, audio_path, language=None, checkpoint=None):
+        logging.info(f"Measuring loudness of {audio_path} to find split points...")
+        loudness = compute_frame_loudness(audio_path, self.FRAME_SECONDS)
+        duration = len(loudness) * self.FRAME_SECONDS
+
+        segments_count = max(1, min(self.workers, int(duration // self.MIN_SEGMENT_SECONDS)))
+        if segments_count == 1:
+            return (yield from super().run_transcription(audio_path, language, checkpoint))
+
+        split_points = find_silence_split_points(loudness, self.FRAME_SECONDS, segments_count)
+        boundaries = [0.0] + split_points + [None]
+
+        workers = len(split_points) + 1
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        logging.info(f"Transcribing {duration:.0f}s in {workers} segments, {threads} threads per worker")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, self.dtype, threads),
+        ) as executor:
+            # detect once up front, otherwise every segment would detect on its own and could disagree
+            if not language:
+                language = executor.submit(_detect_language, self.model_name, self.device, self.dtype, audio_path).result()
+
+            futures = []
+            for index, (start, end) in enumerate(zip(boundaries, boundaries[1:]), start=1):
+                segment_start = max(0.0, start - self.OVERLAP_SECONDS)
+                segment_duration = end - segment_start if end is not None else None
+                segment_checkpoint_path = checkpoint.part(index, workers).path if checkpoint else None
+                futures.append(executor.submit(
+                    _transcribe_segment,
+                    self.model_name, self.device, self.dtype, self.profile, audio_path, segment_start, segment_duration, segment_checkpoint_path, language,
+                ))
+
+            segments = []
+            detected_language = None
+            for index, future in enumerate(futures, start=1):
+                segment_segments, segment_language = future.result()
+                logging.info(f"Segment {index}/{len(futures)} transcribed")
+
+                stitched_segments = self.__stitch_segments(segments, segment_segments)
+                segments.extend(stitched_segments)
+                yield from stitched_segments
+                detected_language = detected_language or segment_language
+
+        return {"language": detected_language}
+
+
+    def __stitch_segments(self, previous_segments, next_segments):
+        if not previous_segments:
+            return next_segments
+
+        # segments that mostly lie before the seam were already transcribed by the previous worker
+        seam = previous_segments[-1]["end"]
+        next_segments = [segment for segment in next_segments if (segment["start"] + segment["end"]) / 2 >= seam]
+        if not next_segments:
+            return []
+
+        previous_text = "".join(segment["text"] for segment in previous_segments[-3:])
+        first_segment = dict(next_segments[0])
+        first_segment["text"] = remove_overlapping_prefix(previous_text, first_segment["text"])
+
+        if not first_segment["text"]:
+            return next_segments[1:]
+
+        return [first_segment] + next_segments[1:]
@@ -1,140 +1,266 @@
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
 import logging
 import speech_recognition as sr
 
 import os
+import time
+import random
 import logging
+import threading
 from tqdm import tqdm
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
 import speech_recognition as sr
 from concurrent.futures import ThreadPoolExecutor
+from config import (
+    TEMP_DIR,
+    SPEECH_RECOGNITION_CACHE_PATH,
+    SPEECH_RECOGNITION_EXPORT_CHUNKS,
+    SPEECH_RECOGNITION_REQUESTS_PER_SECOND,
+    SPEECH_RECOGNITION_MAX_CONCURRENCY,
+    SPEECH_RECOGNITION_MAX_RETRIES,
+    SPEECH_RECOGNITION_BACKOFF_SECONDS,
+    SPEECH_RECOGNITION_MAX_BACKOFF_SECONDS,
+    SPEECH_RECOGNITION_AUTO_THRESHOLD,
+    SPEECH_RECOGNITION_CHUNK_SECONDS,
+)
+from transcripto.utils.audio import is_pcm_file, load_pcm, get_audio_duration, SAMPLE_RATE
+from transcripto.utils.checkpoint import TranscriptionCheckpoint
+from transcripto.utils.chunk_cache import ChunkTranscriptCache
+from transcripto.utils.silence import SilenceSplitter
+from transcripto.utils.rate_limit import TokenBucket, AdaptiveConcurrencyLimiter
 from .transcriptor_base import TranscriptorBase
 
 
 class SpeechRecognitionTranscriptor(TranscriptorBase):
-    def transcribe(
-        self, mp3_path, temp_dir, title, language="en-US", force=False
+    DEFAULT_LANGUAGE = "en-US"
+    KEEP_SILENCE_MS = 500
+    MIN_SILENCE_LEN_MS = 1000
+    SILENCE_THRESH_DB = -14
+    # reasons of request errors retrying cannot fix, anything else is treated as throttling
+    PERMANENT_ERROR_MARKERS = ("bad request", "unauthorized", "forbidden", "invalid", "api key")
+
+    def __init__(
+            self, temp_dir=TEMP_DIR, min_silence_len=None, silence_thresh=None, force=False,
+            cache_path=SPEECH_RECOGNITION_CACHE_PATH, export_chunks=SPEECH_RECOGNITION_EXPORT_CHUNKS,
+            requests_per_second=SPEECH_RECOGNITION_REQUESTS_PER_SECOND, max_concurrency=SPEECH_RECOGNITION_MAX_CONCURRENCY,
+            max_retries=SPEECH_RECOGNITION_MAX_RETRIES, auto_threshold=SPEECH_RECOGNITION_AUTO_THRESHOLD,
+            chunk_seconds=SPEECH_RECOGNITION_CHUNK_SECONDS,
     ):
         """
-        Transcribes an MP3 file into text with chunk processing, logging, and error handling.
-
         Args:
-            mp3_path (str): Path to the MP3 file.
-            temp_dir (str): Directory for temporary chunk files.
-            language (str): Language code for transcription.
-            min_silence_len (int): Minimum silence length to split audio (ms).
-            silence_thresh (int): Silence threshold relative to dBFS.
-            force (bool): Force reprocessing of existing chunks.
+            temp_dir (str): Directory for the debug chunk files.
+            min_silence_len (int): Minimum silence length to split audio (ms), 1000 when None.
+            silence_thresh (int): Silence threshold relative to dBFS, -14 when None.
+            force (bool): Force reprocessing of chunks found in the cache.
+            cache_path (str): SQLite file caching the recognized text of every chunk.
+            export_chunks (bool): Also write every chunk to `temp_dir` as WAV, for debugging.
+            requests_per_second (float): Cap on the recognition request rate.
+            max_concurrency (int): Upper bound of the adaptive number of requests in flight.
+            max_retries (int): Retries of a throttled request, with exponential backoff, before the run fails.
+            auto_threshold (bool): Calibrate the silence criteria on every file, unless `min_silence_len` or `silence_thresh` is given.
+            chunk_seconds (tuple[float, float]): Chunk duration range targeted by the calibration.
+        """
+        self.temp_dir = temp_dir
+        self.min_silence_len = min_silence_len
+        self.silence_thresh = silence_thresh
+        self.force = force
+        self.cache_path = cache_path
+        self.export_chunks = export_chunks
+        self.requests_per_second = requests_per_second
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.auto_threshold = auto_threshold
+        self.chunk_seconds = chunk_seconds
+
+
+    def load_audio_segment(self, audio_path):
+        """
+        Wraps the decoded PCM artifact in an AudioSegment without decoding it again,
+        other audio files are still decoded through pydub.
+        """
+        if is_pcm_file(audio_path):
+            return AudioSegment(
+                data=load_pcm(audio_path).tobytes(),
+                sample_width=2,
+                frame_rate=SAMPLE_RATE,
+                channels=1,
+            )
+
+        # chunks are handed to the recognizer as raw mono samples
+        return AudioSegment.from_file(audio_path).set_channels(1)
+
+
+    def split_chunk_ranges(self, audio):
+        """
+        Finds the chunks to transcribe, same as `pydub.silence.split_on_silence` but keeping
+        the position of every chunk. With `auto_threshold` and no explicit criteria, the silence
+        criteria are calibrated on the file, and chunks are merged and split to fall within `chunk_seconds`.
 
         Returns:
-            str: Final transcription text.
+            list[tuple[int, int]]: (start, end) of every chunk in milliseconds.
+        """
+        splitter = SilenceSplitter.from_audio_segment(audio)
+
+        explicit_criteria = self.min_silence_len is not None or self.silence_thresh is not None
+
+        if self.auto_threshold and not explicit_criteria:
+            min_chunk_seconds, max_chunk_seconds = self.chunk_seconds
+            return splitter.split_balanced(
+                min_chunk_ms = int(min_chunk_seconds * 1000),
+                max_chunk_ms = int(max_chunk_seconds * 1000),
+                keep_silence = self.KEEP_SILENCE_MS,
+            )
+
+        if self.auto_threshold:
+            logging.info("Silence criteria given explicitly, skipping the calibration")
+
+        return splitter.split_on_silence(
+            min_silence_len = self.MIN_SILENCE_LEN_MS if self.min_silence_len is None else self.min_silence_len,
+            silence_thresh = splitter.dbfs + (self.SILENCE_THRESH_DB if self.silence_thresh is None else self.silence_thresh),
+            keep_silence = self.KEEP_SILENCE_MS,
+        )
+
+
+    def iter_transcribe(self, audio_path, language=None, checkpoint_path=None):
         """
+        Transcribes an audio file into text with chunk processing, logging, and error handling,
+        yielding every chunk in order as soon as it and the chunks before it are recognized.
+        A run that fails raises instead of leaving a partial transcript to be saved.
+
+        Args:
+            audio_path (str): Path to the PCM artifact or audio file.
+            language (str): Language code for transcription, en-US when None.
+            checkpoint_path (str): Sidecar file recording transcribed chunks, they are skipped on resume.
 
-        min_silence_len = 1000
-        silence_thresh = -14
+        Yields:
+            dict: Segment with the start and end of the chunk in seconds and its text.
+        """
+        start_time = time.time()
+        language = language or self.DEFAULT_LANGUAGE
+        title = os.path.splitext(os.path.basename(audio_path))[0]
+        temp_dir = self.temp_dir
+        force = self.force
+
+        output = {
+            "text": "",
+            "detected_language": language,
+            "duration_seconds": "0.00",
+            "segments": [],
+        }
+        self.last_output = output
 
         # Load audio
         try:
-            audio = AudioSegment.from_mp3(mp3_path)
+            audio = self.load_audio_segment(audio_path)
         except Exception as e:
             logging.error(f"Failed to load audio file: {e}")
-            return ""
+            raise
 
 
         # Split the audio into chunks
         logging.info("Splitting audio into chunks...")
         try:
-            chunks = split_on_silence(
-                audio,
-                min_silence_len = min_silence_len,
-                silence_thresh = audio.dBFS + silence_thresh,
-                keep_silence = 500,
-            )
+            chunk_ranges = self.split_chunk_ranges(audio)
+            chunks = [audio[start:end] for start, end in chunk_ranges]
         except Exception as e:
             logging.error(f"Error splitting audio: {e}")
-            return ""
+            raise
 
 
         if not chunks:
-            logging.error("No chunks detected. Check silence threshold and audio content.")
-            return ""
+            raise RuntimeError(f"No chunks detected in {audio_path}. Check silence threshold and audio content.")
 
 
         # Debug: Log chunk details
-        for i, chunk in enumerate(chunks, start=1):
-            logging.debug(f"Chunk {i}: Length={len(chunk)}ms, dBFS={chunk.dBFS}")
+        for i, (chunk, (start, end)) in enumerate(zip(chunks, chunk_ranges), start=1):
+            logging.debug(f"Chunk {i}: {start}-{end}ms, Length={len(chunk)}ms, dBFS={chunk.dBFS}")
 
         logging.info(f"Detected {len(chunks)} chunks for transcription.")
 
 
         recognizer = sr.Recognizer()
+        cache = ChunkTranscriptCache(self.cache_path)
+        rate_limiter = TokenBucket(self.requests_per_second)
+        concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=self.max_concurrency)
+        request_stats = {"requests": 0, "retries": 0, "backoff_seconds": 0.0, "lock": threading.Lock()}
         transcription_results = {}
         problematic_chunks = []
 
+        checkpoint = TranscriptionCheckpoint(checkpoint_path) if checkpoint_path else None
+        checkpointed_chunks = {record["index"]: record["text"] for record in checkpoint.load()} if checkpoint else {}
+
 
         def process_chunk(chunk_info):
             """
-            Process a single chunk: save it as WAV, transcribe, and handle errors.
+            Process a single chunk: transcribe it straight from memory unless its text is cached, and handle errors.
             """
             chunk_id, chunk = chunk_info
-            chunk_path = os.path.join(temp_dir, f"{title}_chunk_{chunk_id}.wav")
+            if chunk_id in checkpointed_chunks:
+                return chunk_id, checkpointed_chunks[chunk_id]
 
+            chunk_name = f"{title}_chunk_{chunk_id}"
+            cache_key = ChunkTranscriptCache.get_key(chunk.raw_data, chunk.frame_rate, chunk.sample_width, language)
+            cached_text = None if force else cache.get(cache_key)
+            if cached_text is not None:
+                logging.debug(f"Chunk {chunk_id}: found in the chunk cache.")
+                if checkpoint:
+                    checkpoint.append([{"index": chunk_id, "text": cached_text}])
+                return chunk_id, cached_text
 
-            # Export chunk to WAV format
-            try:
-                # Skip export chunk if already processed, wav file exists
-                if force or not os.path.exists(chunk_path):
-                    chunk.export(chunk_path, format="wav")
-                    logging.debug(f"Exported {chunk_path}: Length={len(chunk)}ms")
-                else:
-                    logging.info(f"Skipping chunk {chunk_id}: already exists.")
-            except Exception as e:
-                logging.error(f"Failed to export chunk {chunk_id}: {e}")
-                problematic_chunks.append(chunk_path)
-                return chunk_id, ""
+            if self.export_chunks:
+                self.__export_chunk(chunk, os.path.join(temp_dir, f"{chunk_name}.wav"))
 
 
             # Transcribe chunk
             try:
-                # Load and process the audio file
-                with sr.AudioFile(chunk_path) as source:
-                    audio_data = recognizer.record(source) # Record the entire audio
-                    text = recognizer.recognize_google(audio_data, language=language)
-                    logging.debug(f"Chunk {chunk_path} -> Chunk_ID: {chunk_id} transcription: {text}")
-                    return chunk_id, text.strip()
+                audio_data = sr.AudioData(chunk.raw_data, chunk.frame_rate, chunk.sample_width)
+                text = self.__recognize(recognizer, audio_data, language, chunk_name, rate_limiter, concurrency_limiter, request_stats)
+                logging.debug(f"Chunk {chunk_name} -> Chunk_ID: {chunk_id} transcription: {text}")
+                cache.set(cache_key, text)
+                if checkpoint:
+                    checkpoint.append([{"index": chunk_id, "text": text}])
+                return chunk_id, text
             except sr.UnknownValueError:
-                logging.warning(f"Could not understand Chunk_ID: {chunk_path} -> {chunk_id}")
-                problematic_chunks.append(chunk_path)
+                logging.warning(f"Could not understand Chunk_ID: {chunk_name} -> {chunk_id}")
+                problematic_chunks.append(chunk_name)
                 return chunk_id, ""
             except sr.RequestError as e:
-                logging.error(f"API request error for Chunk_ID: {chunk_path} -> {chunk_id}: {e}")
-                problematic_chunks.append(chunk_path)
-                return chunk_id, ""
+                # the chunks recognized so far are cached and checkpointed, a rerun only sends the missing ones
+                raise RuntimeError(f"API request error for Chunk_ID: {chunk_name} -> {chunk_id}: {e}") from e
 
 
-        # Process all chunks in parallel
+        # Process all chunks in parallel, handing them out in order
+        segments = []
+        requests_start_time = time.time()
         try:
-            with ThreadPoolExecutor() as executor:
-                results = list(
-                    tqdm(
-                        executor.map(process_chunk, enumerate(chunks, start=1)),
-                        total = len(chunks),
-                        desc = "Processing Chunks",
-                    )
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = tqdm(
+                    executor.map(process_chunk, enumerate(chunks, start=1)),
+                    total = len(chunks),
+                    desc = "Processing Chunks",
                 )
+                for (chunk_id, text), (start, end) in zip(results, chunk_ranges):
+                    if not text:
+                        logging.warning(f"Chunk {chunk_id} returned empty transcription.")
+                        continue
+
+                    transcription_results[chunk_id] = text
+                    segment = {"start": start / 1000, "end": end / 1000, "text": text}
+                    segments.append(segment)
+                    yield segment
         except Exception as e:
             logging.error(f"Error during chunk processing: {e}")
-            return ""
-
+            raise
+        finally:
+            cache.close()
 
-        # Collect results explicitly to avoid losing chunks
-        for chunk_id, text in results:
-            if text:
-                transcription_results[chunk_id] = text
-            else:
-                logging.warning(f"Chunk {chunk_id} returned empty transcription.")
+        requests_elapsed = time.time() - requests_start_time
+        logging.info(
+            f"Sent {request_stats['requests']} recognition requests with {request_stats['retries']} retries "
+            f"({request_stats['backoff_seconds']:.1f}s of backoff), "
+            f"{request_stats['requests'] / requests_elapsed if requests_elapsed else 0.0:.2f} requests/s, "
+            f"concurrency settled at {int(concurrency_limiter.limit)}"
+        )
 
 
         # Ensure transcription results are sorted by chunk ID
@@ -152,9 +278,81 @@ class SpeechRecognitionTranscriptor(TranscriptorBase):
 
         # Log and save problematic chunks
         if problematic_chunks:
+            os.makedirs(temp_dir, exist_ok=True)
             problematic_file = os.path.join(temp_dir, "problematic_chunks.txt")
             with open(problematic_file, "w", encoding="utf-8") as f:
                 f.writelines(f"{chunk}\n" for chunk in problematic_chunks)
             logging.warning(f"Problematic chunks saved to {problematic_file}")
 
-        return transcription
+        elapsed = time.time() - start_time
+        audio_duration = get_audio_duration(audio_path)
+        output["text"] = transcription
+        output["duration_seconds"] = f"{elapsed:.2f}"
+        output["real_time_factor"] = round(elapsed / audio_duration, 4) if audio_duration else None
+        output["segments"] = segments
+
+
+    @classmethod
+    def is_permanent_error(cls, error):
+        """
+        Returns:
+            bool: The request error would repeat on every retry, like a rejected key or request.
+        """
+        message = str(error).lower()
+
+        return any(marker in message for marker in cls.PERMANENT_ERROR_MARKERS)
+
+
+    def __recognize(self, recognizer, audio_data, language, chunk_name, rate_limiter, concurrency_limiter, request_stats):
+        """
+        Sends a chunk to the recognizer within the rate and concurrency limits, retrying
+        throttled requests with capped exponential backoff and jitter while the concurrency
+        limit backs off too. Errors retrying cannot fix, such as a rejected key, fail at once.
+
+        Raises:
+            sr.UnknownValueError: The chunk holds no recognizable speech.
+            sr.RequestError: The request failed permanently or was still throttled after the last retry.
+        """
+        for attempt in range(self.max_retries + 1):
+            rate_limiter.acquire()
+            concurrency_limiter.acquire()
+            with request_stats["lock"]:
+                request_stats["requests"] += 1
+                if attempt:
+                    request_stats["retries"] += 1
+
+            try:
+                text = recognizer.recognize_google(audio_data, language=language).strip()
+            except sr.RequestError as e:
+                if self.is_permanent_error(e):
+                    concurrency_limiter.release()
+                    logging.error(f"Request for {chunk_name} failed permanently ({e}), not retrying")
+                    raise
+
+                # quota errors and dropped connections both mean the service is overloaded
+                concurrency_limiter.release(throttled=True)
+                if attempt == self.max_retries:
+                    raise
+
+                backoff = min(SPEECH_RECOGNITION_MAX_BACKOFF_SECONDS, SPEECH_RECOGNITION_BACKOFF_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.5)
+                with request_stats["lock"]:
+                    request_stats["backoff_seconds"] += backoff
+
+                logging.warning(f"Request for {chunk_name} failed ({e}), retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+            except Exception:
+                concurrency_limiter.release()
+                raise
+            else:
+                concurrency_limiter.release()
+                return text
+
+
+    def __export_chunk(self, chunk, chunk_path):
+        try:
+            os.makedirs(self.temp_dir, exist_ok=True)
+            chunk.export(chunk_path, format="wav")
+            logging.debug(f"Exported {chunk_path}: Length={len(chunk)}ms")
+        except Exception as e:
+            logging.warning(f"Failed to export chunk {chunk_path}: {e}")
+
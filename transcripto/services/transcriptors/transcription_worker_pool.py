@@ -0,0 +1,156 @@
+import os
+import gc
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from config import WHISPER_THREADS_PER_WORKER
+from transcripto.utils.audio import get_audio_duration
+from transcripto.utils.cpu import partition_cores, pin_current_process
+from transcripto.utils.memory import get_memory_usage, format_memory_usage
+from .transcriptor_factory import TranscriptorFactory
+from .wisper_transcriptor import WhisperTranscriptor
+from .whisper_model_registry import WhisperModelRegistry
+
+_worker_cores = None
+
+
+def _init_worker(core_sets):
+    global _worker_cores
+
+    _worker_cores = core_sets.get()
+    pin_current_process(_worker_cores)
+    logging.info(f"Worker {os.getpid()} started, {format_memory_usage(get_memory_usage())}")
+
+
+def _transcribe_episode(transcript_engine, engine_options, audio_path, language, checkpoint_path):
+    transcriptor = TranscriptorFactory.get_transcriptor(transcript_engine, **engine_options)
+
+    start_time = time.time()
+    transcription_output = transcriptor.transcribe(audio_path, language=language, checkpoint_path=checkpoint_path)
+
+    return tuple(_worker_cores), time.time() - start_time, get_memory_usage(), transcription_output
+
+
+class TranscriptionWorkerPool:
+    """
+    Transcribes episodes in a pool of worker processes, each pinned to its own disjoint set
+    of cores with a matching torch thread count.
+
+    The pool size is the number of available cores divided by the threads given to every
+    worker, unless a smaller number of workers is requested.
+
+    In pre-fork mode the parent loads the Whisper model once and forks the workers, which
+    read its weights from the copy-on-write pages instead of loading a copy each.
+    """
+
+    def __init__(self, transcript_engine, threads_per_worker=WHISPER_THREADS_PER_WORKER, workers=None, prefork=False, engine_options=None):
+        """
+        Args:
+            workers (int): Pool workers, derived from the core count when None.
+            engine_options (dict): Options every worker constructs the engine with, kept apart
+                from the pool's own since engines like wisper_parallel take `workers` too.
+        """
+        self.transcript_engine = transcript_engine
+        self.engine_options = dict(engine_options or {})
+        self.core_sets = partition_cores(threads_per_worker, workers)
+        self.prefork = prefork
+
+
+    def transcribe(self, jobs, language=None):
+        """
+        Transcribes the jobs in the pool, reporting the throughput of every worker.
+
+        Args:
+            jobs (list[tuple[str, str]]): (audio path, checkpoint path) of every episode.
+            language (str): BCP-47 language tag, detected per episode when None.
+
+        Returns:
+            list[dict]: One transcription result per job, in the same order.
+        """
+        if self.prefork:
+            self.__share_model()
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context("spawn")
+
+        core_sets = context.Queue()
+        for cores in self.core_sets:
+            core_sets.put(cores)
+
+        logging.info(
+            f"Starting {len(self.core_sets)} transcription workers with {len(self.core_sets[0])} threads each "
+            f"for {len(jobs)} episodes"
+        )
+
+        start_time = time.time()
+        with ProcessPoolExecutor(
+            max_workers=len(self.core_sets),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(core_sets,),
+        ) as executor:
+            futures = [
+                executor.submit(_transcribe_episode, self.transcript_engine, self.engine_options, audio_path, language, checkpoint_path)
+                for audio_path, checkpoint_path in jobs
+            ]
+
+            worker_stats = {}
+            results = []
+            for (audio_path, _), future in zip(jobs, futures):
+                cores, elapsed, memory_usage, transcription_output = future.result()
+                results.append(transcription_output)
+
+                stats = worker_stats.setdefault(cores, {"episodes": 0, "audio_seconds": 0.0, "busy_seconds": 0.0, "private_mb": 0.0})
+                stats["episodes"] += 1
+                stats["audio_seconds"] += get_audio_duration(audio_path)
+                stats["busy_seconds"] += elapsed
+                stats["private_mb"] = max(stats["private_mb"], memory_usage.get("private", 0.0))
+
+        if self.prefork:
+            gc.unfreeze()
+
+        self.__report(worker_stats, time.time() - start_time)
+
+        return results
+
+
+    def __share_model(self):
+        transcriptor = TranscriptorFactory.get_transcriptor(self.transcript_engine, **self.engine_options)
+        if not isinstance(transcriptor, WhisperTranscriptor):
+            raise ValueError(f"Pre-fork mode needs a wisper engine, got {self.transcript_engine}")
+
+        memory_before = get_memory_usage()
+        WhisperModelRegistry.share_model(transcriptor.model_name, transcriptor.device, transcriptor.dtype)
+
+        # objects created so far are never collected, so the collector does not touch their pages in the workers
+        gc.collect()
+        gc.freeze()
+
+        memory_after = get_memory_usage()
+        if memory_before and memory_after:
+            logging.info(
+                f"Loaded the shared model in the parent, +{memory_after['rss'] - memory_before['rss']:.0f}MB RSS, "
+                f"workers fork from {format_memory_usage(memory_after)}"
+            )
+
+
+    def __report(self, worker_stats, wall_seconds):
+        total_audio_seconds = 0.0
+        for cores, stats in sorted(worker_stats.items()):
+            speed = stats["audio_seconds"] / stats["busy_seconds"] if stats["busy_seconds"] else 0.0
+            total_audio_seconds += stats["audio_seconds"]
+            logging.info(
+                f"Worker on cores {list(cores)}: {stats['episodes']} episodes, {stats['audio_seconds']:.0f}s of audio "
+                f"in {stats['busy_seconds']:.0f}s ({speed:.2f}x realtime), {stats['private_mb']:.0f}MB private memory"
+            )
+
+        idle_workers = len(self.core_sets) - len(worker_stats)
+        if idle_workers:
+            logging.info(f"{idle_workers} workers received no episode")
+
+        speed = total_audio_seconds / wall_seconds if wall_seconds else 0.0
+        logging.info(
+            f"Pool of {len(self.core_sets)}x{len(self.core_sets[0])} threads on {os.cpu_count()} CPUs: "
+            f"{total_audio_seconds:.0f}s of audio in {wall_seconds:.0f}s ({speed:.2f}x realtime)"
+        )
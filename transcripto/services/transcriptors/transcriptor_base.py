@@ -1,6 +1,20 @@
 from abc import ABC, abstractmethod
 
 class TranscriptorBase(ABC):
+    # metadata of the last finished `iter_transcribe` run
+    last_output = None
+
     @abstractmethod
-    def transcribe(self, audio_path):
-        pass
\ No newline at end of file
+    def iter_transcribe(self, audio_path, language=None, checkpoint_path=None):
+        """
+        Yields the segments of the transcription, each with start and end times in seconds and
+        its text, as soon as they are decoded. `last_output` holds the full transcription
+        result once the generator is exhausted.
+        """
+        pass
+
+    def transcribe(self, audio_path, language=None, checkpoint_path=None):
+        for _ in self.iter_transcribe(audio_path, language=language, checkpoint_path=checkpoint_path):
+            pass
+
+        return self.last_output
@@ -1,17 +1,44 @@
+import inspect
+import logging
 from .speech_recognition_transcriptor import SpeechRecognitionTranscriptor
 from .wisper_transcriptor import WhisperTranscriptor
+from .parallel_wisper_transcriptor import ParallelWhisperTranscriptor
+from .wisper_int8_transcriptor import WhisperInt8Transcriptor
+from .batched_wisper_transcriptor import BatchedWhisperTranscriptor
 
 
 class TranscriptorFactory:
     transcriptor_engines_mapping = {
         "speech_recognition": SpeechRecognitionTranscriptor,
         "wisper": WhisperTranscriptor,
+        "wisper_parallel": ParallelWhisperTranscriptor,
+        "wisper_int8": WhisperInt8Transcriptor,
+        "wisper_batched": BatchedWhisperTranscriptor,
     }
 
     @staticmethod
-    def get_transcriptor(transcriptor_engine):
+    def get_transcriptor_class(transcriptor_engine):
         transcriptor_cls = TranscriptorFactory.transcriptor_engines_mapping.get(transcriptor_engine)
         if not transcriptor_cls:
             raise ValueError(f"Unsupported transcription engine: {transcriptor_engine}")
-        return transcriptor_cls()
+        return transcriptor_cls
 
+    @staticmethod
+    def get_engine_options(transcriptor_engine, **options):
+        """
+        Keeps the options the engine accepts, the others are dropped with a warning.
+
+        Returns:
+            dict: Options to construct the engine with.
+        """
+        parameters = inspect.signature(TranscriptorFactory.get_transcriptor_class(transcriptor_engine)).parameters
+        ignored = [name for name in options if name not in parameters]
+        if ignored:
+            logging.warning(f"Transcription engine {transcriptor_engine} does not support {', '.join(ignored)}, ignoring")
+
+        return {name: value for name, value in options.items() if name in parameters}
+
+    @staticmethod
+    def get_transcriptor(transcriptor_engine, **options):
+        transcriptor_cls = TranscriptorFactory.get_transcriptor_class(transcriptor_engine)
+        return transcriptor_cls(**TranscriptorFactory.get_engine_options(transcriptor_engine, **options))
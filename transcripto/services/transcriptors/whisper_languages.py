@@ -0,0 +1,36 @@
+import logging
+from whisper.tokenizer import LANGUAGES, TO_LANGUAGE_CODE
+
+# BCP-47 primary subtags that Whisper knows under a different code
+BCP47_ALIASES = {
+    "iw": "he",
+    "jv": "jw",
+    "nb": "no",
+    "fil": "tl",
+}
+
+
+def to_whisper_language(language):
+    """
+    Maps a BCP-47 tag (e.g. 'en-US', 'he-IL') or a language name to the code Whisper decodes with.
+
+    Args:
+        language (str): Language tag or name, None when unknown.
+
+    Returns:
+        str: Whisper language code, None if the language should be detected.
+    """
+    if not language:
+        return None
+
+    normalized = language.strip().lower().replace("_", "-")
+    if normalized in TO_LANGUAGE_CODE:
+        return TO_LANGUAGE_CODE[normalized]
+
+    primary = normalized.split("-")[0]
+    primary = BCP47_ALIASES.get(primary, primary)
+    if primary in LANGUAGES:
+        return primary
+
+    logging.warning(f"Language {language} is not supported by Whisper, it will be detected instead")
+    return None
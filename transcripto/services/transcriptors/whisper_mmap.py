@@ -0,0 +1,110 @@
+import os
+import time
+import logging
+import numpy as np
+import torch
+import whisper
+from whisper.model import Whisper, ModelDimensions, AudioEncoder, TextDecoder
+from config import WHISPER_MODELS_DIR
+from transcripto.utils.memory import get_memory_usage, format_memory_usage
+
+
+def get_mmap_model_path(model_name):
+    return os.path.join(WHISPER_MODELS_DIR, f"{os.path.basename(model_name)}_mmap.pt")
+
+
+def convert_model(model_name):
+    """
+    Converts a Whisper checkpoint once into a plain fp32 state dict in the torch zip format,
+    which `torch.load` can memory-map instead of deserializing.
+
+    Args:
+        model_name (str): Whisper model name.
+
+    Returns:
+        str: Path to the converted weights.
+    """
+    mmap_model_path = get_mmap_model_path(model_name)
+
+    start_time = time.time()
+    model = whisper.load_model(model_name, device="cpu")
+
+    os.makedirs(WHISPER_MODELS_DIR, exist_ok=True)
+    temp_path = f"{mmap_model_path}.part"
+    torch.save({"dims": model.dims.__dict__, "model_state_dict": model.state_dict()}, temp_path)
+    os.replace(temp_path, mmap_model_path)
+    logging.info(f"Converted Whisper model {model_name} to {mmap_model_path} in {time.time() - start_time:.2f} seconds.")
+
+    return mmap_model_path
+
+
+def _build_empty_model(dims):
+    """
+    Builds the Whisper modules on the meta device, without allocating or initializing weights.
+    Mirrors `Whisper.__init__`, whose sparse alignment heads mask cannot be created on the meta device.
+    """
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer)
+        model.decoder = TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer)
+
+    return model
+
+
+def _restore_buffers(model, model_name):
+    """
+    Recreates the buffers that are not stored in the state dict.
+    """
+    n_ctx = model.dims.n_text_ctx
+    model.decoder.mask = torch.empty(n_ctx, n_ctx).fill_(-np.inf).triu_(1)
+
+    # the default heads, overridden by the tuned ones of the official models
+    all_heads = torch.zeros(model.dims.n_text_layer, model.dims.n_text_head, dtype=torch.bool)
+    all_heads[model.dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+
+    alignment_heads = whisper._ALIGNMENT_HEADS.get(model_name)
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+
+
+def load_mmap_model(model_name, device="cpu"):
+    """
+    Loads a Whisper model from memory-mapped weights, converting the checkpoint on first use.
+    The module is built on the meta device and takes the mapped tensors as its parameters,
+    so nothing is read from disk until a page is touched.
+
+    Args:
+        model_name (str): Whisper model name.
+        device (str): Torch device, weights are copied to it when it is not the CPU.
+
+    Returns:
+        Whisper: The loaded model in eval mode.
+    """
+    mmap_model_path = get_mmap_model_path(model_name)
+    if not os.path.exists(mmap_model_path):
+        convert_model(model_name)
+
+    memory_before = get_memory_usage()
+    start_time = time.time()
+
+    checkpoint = torch.load(mmap_model_path, map_location="cpu", mmap=True, weights_only=True)
+    model = _build_empty_model(ModelDimensions(**checkpoint["dims"]))
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    _restore_buffers(model, model_name)
+
+    if device != "cpu":
+        model = model.to(device)
+
+    memory_after = get_memory_usage()
+    logging.info(f"Mapped Whisper model {mmap_model_path} in {time.time() - start_time:.2f} seconds.")
+    if memory_before and memory_after:
+        logging.info(
+            f"Resident memory {format_memory_usage(memory_before)} before loading, "
+            f"{format_memory_usage(memory_after)} after"
+        )
+
+    return model.eval()
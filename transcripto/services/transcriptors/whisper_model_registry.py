@@ -0,0 +1,192 @@
+import os
+import time
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+import torch
+import whisper
+from config import WHISPER_MODEL_CACHE_SIZE, WHISPER_MMAP_WEIGHTS
+from .whisper_quantization import load_quantized_model
+from .whisper_mmap import load_mmap_model
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded Whisper models.
+
+    Models are keyed by (model name, device, dtype) and loaded at most once per
+    process, every transcriptor asking for the same key gets the same instance.
+    When more than `max_models` keys are loaded, the least recently used model is evicted.
+
+    A model is not safe to decode from several threads at once, the KV-cache hooks Whisper
+    installs for every decode belong to the model, so decodes hold the lock of their key.
+    """
+    max_models = WHISPER_MODEL_CACHE_SIZE
+
+    _models = OrderedDict()
+    _lock = threading.RLock()
+    _decode_locks = {}
+
+
+    @staticmethod
+    def default_device():
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+    @classmethod
+    def get_key(cls, model_name, device=None, dtype=None):
+        device = device or cls.default_device()
+        dtype = dtype or "float32"
+
+        return (model_name, device, dtype)
+
+
+    @classmethod
+    def get_model(cls, model_name, device=None, dtype=None):
+        """
+        Returns a loaded Whisper model, loading it on first use.
+
+        Args:
+            model_name (str): Whisper model name (e.g. 'turbo', 'small').
+            device (str): Torch device, defaults to cuda when available.
+            dtype (str): Weights dtype, 'float32' (default) or 'int8' for the quantized CPU variant.
+
+        Returns:
+            whisper.model.Whisper: The shared model instance.
+        """
+        key = cls.get_key(model_name, device, dtype)
+
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is not None:
+                cls._models.move_to_end(key)
+                logging.debug(f"Whisper model {key} served from registry")
+                return model
+
+            model = cls._load_model(*key)
+            cls._models[key] = model
+
+            while len(cls._models) > cls.max_models:
+                evicted_key, _ = cls._models.popitem(last=False)
+                logging.info(f"Evicted least recently used Whisper model {evicted_key}")
+                cls._release_memory()
+
+            return model
+
+
+    @classmethod
+    def decode_lock(cls, model_name, device=None, dtype=None):
+        """
+        Returns:
+            threading.Lock: The lock to hold while decoding with the model of this key.
+        """
+        key = cls.get_key(model_name, device, dtype)
+
+        with cls._lock:
+            return cls._decode_locks.setdefault(key, threading.Lock())
+
+
+    @classmethod
+    def share_model(cls, model_name, device=None, dtype=None, start_method="fork"):
+        """
+        Loads a model meant to be inherited by worker processes. Its weights are frozen, so
+        forked workers keep reading the parent's pages copy-on-write instead of loading their
+        own copy. Only workers started another way need the weights moved to shared memory,
+        and memory-mapped weights are left alone, every process maps the same file anyway.
+
+        Args:
+            start_method (str): Multiprocessing start method of the workers.
+
+        Returns:
+            whisper.model.Whisper: The shared model instance.
+        """
+        key = cls.get_key(model_name, device, dtype)
+        if key[1] != "cpu":
+            raise ValueError(f"Only CPU Whisper models can be shared with worker processes, got {key[1]}")
+
+        model = cls.get_model(*key)
+        model.eval()
+        model.requires_grad_(False)
+
+        # copying the weights into shared memory would read every mapped page and defeat the lazy loading
+        if start_method == "fork" or cls._uses_mmap(key[2]):
+            return model
+
+        for tensor in itertools.chain(model.parameters(), model.buffers()):
+            # the alignment heads mask is sparse and has no storage to share, it is tiny anyway
+            if not tensor.is_sparse:
+                tensor.share_memory_()
+
+        return model
+
+
+    @staticmethod
+    def _uses_mmap(dtype):
+        return dtype == "float32" and WHISPER_MMAP_WEIGHTS
+
+
+    @classmethod
+    def _load_model(cls, model_name, device, dtype):
+        start_time = time.time()
+        logging.info(f"Loading Whisper model {model_name} on {device} ({dtype})")
+
+        if dtype == "int8":
+            if device != "cpu":
+                raise ValueError(f"int8 Whisper models only run on the CPU, got {device}")
+            model = load_quantized_model(model_name)
+        elif cls._uses_mmap(dtype):
+            model = load_mmap_model(model_name, device)
+        elif dtype == "float32":
+            model = whisper.load_model(model_name, device=device)
+            model.eval()
+        else:
+            raise ValueError(f"Unsupported Whisper model dtype: {dtype}")
+
+        logging.info(f"Whisper model {model_name} loaded in {time.time() - start_time:.2f} seconds.")
+
+        return model
+
+
+    @classmethod
+    def evict(cls, model_name, device=None, dtype=None):
+        """
+        Unloads a single model from the registry.
+
+        Returns:
+            bool: True if the model was loaded and got evicted.
+        """
+        key = cls.get_key(model_name, device, dtype)
+
+        with cls._lock:
+            if cls._models.pop(key, None) is None:
+                return False
+
+        logging.info(f"Evicted Whisper model {key}")
+        cls._release_memory()
+
+        return True
+
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._models.clear()
+
+        cls._release_memory()
+
+
+    @classmethod
+    def loaded_models(cls):
+        with cls._lock:
+            return list(cls._models.keys())
+
+
+    @staticmethod
+    def _release_memory():
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+# a forked worker decodes its own copy of the model, a lock held by another parent thread at fork time would never be released
+os.register_at_fork(after_in_child=WhisperModelRegistry._decode_locks.clear)
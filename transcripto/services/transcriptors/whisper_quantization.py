@@ -0,0 +1,78 @@
+import os
+import time
+import logging
+import torch
+import whisper
+from whisper.model import Whisper, ModelDimensions
+from config import WHISPER_MODELS_DIR
+
+
+def _replace_linear_layers(module):
+    """
+    Whisper uses its own Linear subclass which the dynamic quantizer does not recognize,
+    swap them for plain torch Linear layers sharing the same weights.
+    """
+    for name, child in module.named_children():
+        if isinstance(child, whisper.model.Linear):
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _replace_linear_layers(child)
+
+
+def quantize_model(model):
+    """
+    Quantizes the linear layers of a Whisper model to int8, activations are quantized on the fly.
+
+    Args:
+        model (Whisper): fp32 model on the CPU, modified in place.
+
+    Returns:
+        Whisper: The quantized model.
+    """
+    _replace_linear_layers(model)
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def get_quantized_model_path(model_name):
+    return os.path.join(WHISPER_MODELS_DIR, f"{model_name}_int8.pt")
+
+
+def load_quantized_model(model_name):
+    """
+    Loads the int8 variant of a Whisper model, the conversion runs once and its
+    weights are cached on disk for the next processes.
+
+    Args:
+        model_name (str): Whisper model name.
+
+    Returns:
+        Whisper: Quantized model on the CPU.
+    """
+    quantized_model_path = get_quantized_model_path(model_name)
+
+    if os.path.exists(quantized_model_path):
+        start_time = time.time()
+        checkpoint = torch.load(quantized_model_path, map_location="cpu", weights_only=False)
+
+        model = quantize_model(Whisper(ModelDimensions(**checkpoint["dims"])))
+        model.load_state_dict(checkpoint["model_state_dict"])
+        logging.info(f"Loaded cached int8 Whisper model {quantized_model_path} in {time.time() - start_time:.2f} seconds.")
+    else:
+        start_time = time.time()
+        model = quantize_model(whisper.load_model(model_name, device="cpu"))
+
+        os.makedirs(WHISPER_MODELS_DIR, exist_ok=True)
+        temp_path = f"{quantized_model_path}.part"
+        torch.save({"dims": model.dims.__dict__, "model_state_dict": model.state_dict()}, temp_path)
+        os.replace(temp_path, quantized_model_path)
+        logging.info(f"Quantized Whisper model {model_name} to int8 in {time.time() - start_time:.2f} seconds, cached to {quantized_model_path}")
+
+    alignment_heads = whisper._ALIGNMENT_HEADS.get(model_name)
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+
+    return model.eval()
@@ -0,0 +1,12 @@
+from config import WHISPER_STREAMING, WHISPER_TIME_COMPRESSION
+from .wisper_transcriptor import WhisperTranscriptor
+
+
+class WhisperInt8Transcriptor(WhisperTranscriptor):
+    """
+    Runs the dynamically quantized int8 variant of the Whisper model on the CPU,
+    the linear layers take a quarter of the fp32 memory and run faster on CPU-only nodes.
+    """
+
+    def __init__(self, model_name=None, streaming=WHISPER_STREAMING, vad=False, profile=None, speed=WHISPER_TIME_COMPRESSION):
+        super().__init__(model_name, device="cpu", dtype="int8", streaming=streaming, vad=vad, profile=profile, speed=speed)
@@ -1,60 +1,437 @@
 import time
+import bisect
 import logging
-import whisper
+import numpy as np
 import torch
+import whisper
 from tqdm import tqdm
 import ssl
+from config import WHISPER_MODEL_NAME, WHISPER_STREAMING, WHISPER_DECODING_PROFILES, WHISPER_TIME_COMPRESSION
+from transcripto.utils.audio import iter_pcm_blocks, load_audio, get_audio_duration, get_time_compressed_file, SAMPLE_RATE
+from transcripto.utils.checkpoint import TranscriptionCheckpoint
+from transcripto.utils.vad import detect_speech_regions
 from .transcriptor_base import TranscriptorBase
+from .whisper_model_registry import WhisperModelRegistry
+from .whisper_languages import to_whisper_language
 
 ssl._create_default_https_context = ssl._create_unverified_context
 
+
+class _PackedTimeline:
+    """
+    Maps positions in regions packed back to back onto the timeline of the file they come from.
+    """
+
+    def __init__(self):
+        self.packed_starts = []
+        self.file_starts = []
+        self.length = 0
+
+
+    def append(self, file_start, samples):
+        if not self.packed_starts or self.file_starts[-1] + self.length - self.packed_starts[-1] != file_start:
+            self.packed_starts.append(self.length)
+            self.file_starts.append(file_start)
+        self.length += samples
+
+
+    def to_file_seconds(self, packed_sample, is_end=False):
+        """
+        Args:
+            is_end (bool): A position on a region boundary closes the earlier region instead of opening the next one.
+        """
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        index = max(0, search(self.packed_starts, packed_sample) - 1)
+
+        return (self.file_starts[index] + packed_sample - self.packed_starts[index]) / SAMPLE_RATE
+
+
 class WhisperTranscriptor(TranscriptorBase):
-    def transcribe(self, audio_path):
+    WINDOW_SECONDS = 30
+    PROMPT_MAX_CHARS = 1000
+    SEGMENT_KEYS = ("start", "end", "text", "avg_logprob")
+    SPEECH_MIN_DBFS = -45
+    LANGUAGE_SEARCH_SECONDS = 600
+
+    def __init__(self, model_name=None, device=None, dtype=None, streaming=WHISPER_STREAMING, vad=False, profile=None, speed=WHISPER_TIME_COMPRESSION):
+        decoding_profile = self.get_decoding_profile(profile)
+
+        self.profile = profile
+        self.model_name = model_name or decoding_profile.get("model_name", WHISPER_MODEL_NAME)
+        self.decode_options = {key: value for key, value in decoding_profile.items() if key != "model_name"}
+        self.device = device
+        self.dtype = dtype
+        self.streaming = streaming
+        self.vad = vad
+        self.speed = speed
+
+
+    @staticmethod
+    def get_decoding_profile(profile):
+        """
+        Returns:
+            dict: Model name and decoding options of a named profile, empty for the Whisper defaults.
         """
-        Transcribes an audio file using the Whisper model with a progress bar.
+        if profile is None:
+            return {}
+
+        if profile not in WHISPER_DECODING_PROFILES:
+            raise ValueError(f"Unsupported decoding profile: {profile}")
+
+        return WHISPER_DECODING_PROFILES[profile]
+
+
+    def iter_transcribe(self, audio_path, language=None, checkpoint_path=None):
+        """
+        Transcribes an audio file using the Whisper model with a progress bar, yielding the
+        segments as their window is decoded.
 
         Args:
             audio_path: Path to the audio file to transcribe.
+            language (str): BCP-47 language tag, detected once and pinned for the whole file when None.
+            checkpoint_path (str): Sidecar file recording progress, an interrupted run resumes from it.
+                Given a path, decoding is windowed unless `streaming` is False, the explicit
+                non-resumable opt-out into a whole file decode.
 
-        Returns:
-            dict: The full transcription result containing text, language, and other metadata.
+        Yields:
+            dict: Segment with start, end, text and avg_logprob, timestamps on the original timeline.
         """
         start_time = time.time()
 
-        logging.info("Loading Whisper model")
-        model = whisper.load_model("turbo")
+        # progress can only be checkpointed window by window, so keeping a checkpoint implies windows
+        windowed = self.streaming or self.vad or (self.streaming is None and checkpoint_path is not None)
+        checkpoint = TranscriptionCheckpoint(checkpoint_path) if checkpoint_path and windowed else None
+
+        # slow conversational speech transcribes almost as well sped up, for proportionally less compute
+        transcription_path = get_time_compressed_file(audio_path, self.speed) if self.speed != 1.0 else audio_path
+        transcription = self.run_transcription(transcription_path, to_whisper_language(language), checkpoint)
+
+        segments = []
+        while True:
+            try:
+                segment = self.rescale_segment(next(transcription), self.speed)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            segments.append(segment)
+            yield segment
+
+        elapsed = time.time() - start_time
+        audio_duration = get_audio_duration(audio_path)
+        real_time_factor = round(elapsed / audio_duration, 4) if audio_duration else None
+        logging.info(f"Transcription complete for {audio_path}! Real-time factor {real_time_factor} ({self.profile or 'default'} profile)")
+
+        self.last_output = {
+            "text": "".join(segment["text"] for segment in segments),
+            "detected_language": result["language"],
+            "duration_seconds": f"{elapsed:.2f}",
+            "real_time_factor": real_time_factor,
+            "skipped_ratio": result.get("skipped_ratio", 0.0),
+            "segments": segments,
+        }
+
+
+    @staticmethod
+    def rescale_segment(segment, speed):
+        """
+        Maps the timestamps of a segment of time compressed audio back to the original timeline.
+        """
+        return {
+            "start": segment["start"] * speed,
+            "end": segment["end"] * speed,
+            "text": segment["text"],
+            "avg_logprob": segment["avg_logprob"],
+        }
+
+
+    @staticmethod
+    def collect(transcription):
+        """
+        Runs a segment generator to completion.
+
+        Returns:
+            tuple[list[dict], dict]: The segments and the value the generator returned.
+        """
+        segments = []
+        while True:
+            try:
+                segments.append(next(transcription))
+            except StopIteration as stop:
+                return segments, stop.value
+
+
+    def run_transcription(self, audio_path, language=None, checkpoint=None):
+        """
+        Runs the Whisper model over the audio file.
+
+        Args:
+            audio_path (str): Path to the audio file.
+            language (str): Whisper language code, detected when None.
+            checkpoint (TranscriptionCheckpoint): Progress sidecar.
+
+        Yields:
+            dict: Decoded segments, in order.
+
+        Returns:
+            dict: The language, and the skipped ratio when the VAD pre-pass ran.
+        """
+        model = WhisperModelRegistry.get_model(self.model_name, self.device, self.dtype)
 
         if torch.cuda.is_available():
             logging.info("Using GPU")
         else:
             logging.info("Using CPU")
 
+        logging.info("Starting transcription...")
+        if self.vad:
+            return (yield from self.transcribe_speech_regions(model, audio_path, language, checkpoint))
+
+        language = language or self.__get_checkpoint_language(checkpoint) or self.detect_language(model, audio_path)
+
+        if self.streaming or checkpoint:
+            return (yield from self.transcribe_windowed(model, audio_path, checkpoint=checkpoint, language=language))
+
         logging.info(f"Loading audio {audio_path}...")
-        audio = whisper.load_audio(audio_path)
+        audio = load_audio(audio_path)
 
-        logging.info("Creating mel spectrogram...")
-        mel = whisper.log_mel_spectrogram(audio).to(model.device)
-        total_frames = mel.shape[-1]  # Total number of time frames in the Mel spectrogram
-        logging.info(f"Mel spectrogram shape: {mel.shape}, Total number of time frames: {total_frames}")  # Debugging: Check shape
+        with WhisperModelRegistry.decode_lock(self.model_name, self.device, self.dtype):
+            result = model.transcribe(audio, verbose=False, language=language, **self.decode_options)
+        for segment in result["segments"]:
+            yield {key: segment[key] for key in self.SEGMENT_KEYS}
 
-        # Verify the mel spectrogram shape
-        if mel.shape[0] != 80:
-            raise ValueError(f"Expected mel spectrogram to have 80 channels, but got {mel.shape[0]}.")
+        return {"language": result["language"]}
 
-        # Set decoding options
-        options = whisper.DecodingOptions(fp16=False)
 
-        logging.info("Starting transcription...")
-        result = model.transcribe(audio, verbose=False)
-        full_text = result["text"]
-        detected_language = result["language"]
+    def detect_language(self, model, audio_path, regions=None):
+        """
+        Detects the spoken language once, on the first 30 seconds that carry speech, so
+        music intros do not mislead the detection and windows never drift between languages.
 
-        logging.info(f"Transcription complete for {audio_path}!")
+        Args:
+            model: Loaded Whisper model.
+            audio_path (str): Path to the audio file.
+            regions (list[tuple[float, float]]): Speech regions from the VAD, the first one is used.
 
-        output = {
-            "text": full_text,
-            "detected_language": detected_language,
-            "duration_seconds": f"{time.time() - start_time:.2f}",
-        }
+        Returns:
+            str: Whisper language code.
+        """
+        start_seconds = regions[0][0] if regions else 0
+        window = None
+
+        blocks = iter_pcm_blocks(audio_path, self.WINDOW_SECONDS, start_seconds=start_seconds, duration_seconds=self.LANGUAGE_SEARCH_SECONDS)
+        for block in blocks:
+            window = window if window is not None else block
+            loudness = 10 * np.log10(max(float(np.mean(np.square(block))), 1e-12))
+            if regions or loudness > self.SPEECH_MIN_DBFS:
+                window = block
+                break
+        blocks.close()
+
+        if window is None:
+            return None
+
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels).to(model.device)
+        with WhisperModelRegistry.decode_lock(self.model_name, self.device, self.dtype):
+            _, probabilities = model.detect_language(mel)
+        language = max(probabilities, key=probabilities.get)
+        logging.info(f"Detected language {language} ({probabilities[language]:.2f}), pinned for the whole file")
+
+        return language
+
+
+    def __get_checkpoint_language(self, checkpoint):
+        """
+        Returns the language pinned by the interrupted run, so a resumed run does not detect it again.
+        """
+        records = checkpoint.load() if checkpoint else []
+
+        return records[-1]["language"] if records else None
+
+
+    def transcribe_speech_regions(self, model, audio_path, language=None, checkpoint=None):
+        """
+        Transcribes only the speech regions found by the VAD pre-pass, skipping music beds,
+        intros and dead air. Segment timestamps stay on the original timeline.
+
+        Returns:
+            dict: Same as `transcribe_windowed`, plus the ratio of audio that was skipped.
+        """
+        speech_regions, total_duration = detect_speech_regions(audio_path)
+
+        language = language or self.__get_checkpoint_language(checkpoint) or self.detect_language(model, audio_path, speech_regions)
+        result = yield from self.transcribe_windowed(model, audio_path, checkpoint=checkpoint, regions=speech_regions, language=language)
+
+        speech_duration = sum(duration for _, duration in speech_regions)
+        result["skipped_ratio"] = round(1 - speech_duration / total_duration, 4) if total_duration else 0.0
+        logging.info(f"VAD skipped {result['skipped_ratio']:.1%} of the audio")
+
+        return result
+
+
+    def transcribe_windowed(self, model, audio_path, start_seconds=0, duration_seconds=None, checkpoint=None, regions=None, language=None):
+        """
+        Transcribes the audio in 30 second windows pulled from the PCM artifact or an ffmpeg
+        decode pipe, keeping memory flat regardless of the episode duration.
+
+        The last segment of every window may be cut mid-word, so it is dropped and its audio
+        is carried over to the start of the next window, while the text decoded so far is
+        passed on as the prompt to keep the decoder context.
+
+        Args:
+            model: Loaded Whisper model.
+            audio_path (str): Path to the audio file.
+            start_seconds (float): Offset to start transcribing from, timestamps stay relative to the file start.
+            duration_seconds (float): Duration to transcribe, None transcribes to the end.
+            checkpoint (TranscriptionCheckpoint): Records every decoded segment, audio it covers is skipped on resume.
+            regions (list[tuple[float, float]]): (start, duration) regions to transcribe instead of a single range, packed into shared windows.
+            language (str): Whisper language code used for every window, detected per window when None.
+
+        Yields:
+            dict: Segments as their window is decoded, checkpointed segments first.
+
+        Returns:
+            dict: The detected language.
+        """
+        regions = regions if regions is not None else [(start_seconds, duration_seconds)]
+        segments = []
+        detected_language = None
+
+        records = checkpoint.load() if checkpoint else []
+        if records:
+            segments = [{key: record[key] for key in self.SEGMENT_KEYS} for record in records]
+            yield from segments
+            detected_language = records[-1]["language"]
+
+            resume_at = records[-1]["resume_at"]
+            regions = self.__skip_regions(regions, resume_at)
+            logging.info(f"Skipping {len(segments)} checkpointed segments, resuming at {resume_at:.2f}s")
+
+        total_duration = None if any(duration is None for _, duration in regions) else sum(duration for _, duration in regions)
+
+        with tqdm(desc="Transcribing", unit="s", total=total_duration and round(total_duration)) as progress:
+            region_language = yield from self.__transcribe_regions(model, audio_path, regions, segments, checkpoint, progress, language)
+            detected_language = detected_language or region_language
+
+        return {"language": detected_language}
+
+
+    def __transcribe_regions(self, model, audio_path, regions, segments, checkpoint, progress, pinned_language):
+        """
+        Packs the regions back to back and decodes them in shared windows, so short speech
+        regions fill a window together instead of each being padded to a window of its own.
+        """
+        window_samples = self.WINDOW_SECONDS * SAMPLE_RATE
+        timeline = _PackedTimeline()
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_offset = 0
+        detected_language = None
+        segments_count = len(segments)
+
+        for region_start, region_duration in regions:
+            file_offset = int(region_start * SAMPLE_RATE)
+            for block in iter_pcm_blocks(audio_path, self.WINDOW_SECONDS, start_seconds=region_start, duration_seconds=region_duration):
+                timeline.append(file_offset, len(block))
+                file_offset += len(block)
+                buffer = np.concatenate([buffer, block])
+
+                while len(buffer) >= window_samples:
+                    consumed, language = self.__transcribe_window(
+                        model, buffer[:window_samples], buffer_offset, timeline, segments, checkpoint, pinned_language, is_last=False
+                    )
+                    detected_language = detected_language or language
+                    yield from segments[segments_count:]
+                    segments_count = len(segments)
+
+                    buffer = buffer[consumed:]
+                    buffer_offset += consumed
+                    progress.update(round(consumed / SAMPLE_RATE))
+
+        if len(buffer) > 0:
+            _, language = self.__transcribe_window(
+                model, buffer, buffer_offset, timeline, segments, checkpoint, pinned_language, is_last=True
+            )
+            detected_language = detected_language or language
+            yield from segments[segments_count:]
+            progress.update(round(len(buffer) / SAMPLE_RATE))
+
+        return detected_language
+
+
+    def __skip_regions(self, regions, resume_at):
+        """
+        Drops the regions, or the beginning of the region, already transcribed before `resume_at`.
+        """
+        remaining_regions = []
+        for start, duration in regions:
+            end = start + duration if duration is not None else None
+            if end is not None and end <= resume_at:
+                continue
+
+            if start < resume_at:
+                start, duration = resume_at, (end - resume_at if end is not None else None)
+            remaining_regions.append((start, duration))
+
+        return remaining_regions
+
+
+    def __transcribe_window(self, model, window, window_offset, timeline, segments, checkpoint, language, is_last):
+        consumed, window_segments, language = self.__decode_window(model, window, segments, language, is_last)
+        window_segments = [
+            dict(
+                segment,
+                start=timeline.to_file_seconds(window_offset + segment["start"] * SAMPLE_RATE),
+                end=timeline.to_file_seconds(window_offset + segment["end"] * SAMPLE_RATE, is_end=True),
+            )
+            for segment in window_segments
+        ]
+
+        if checkpoint:
+            # a record torn mid-window must not mark the rest of the window as done
+            context = self.__get_prompt(segments)
+            window_end = timeline.to_file_seconds(window_offset + consumed)
+            checkpoint.append([
+                dict(
+                    segment,
+                    index=len(segments) + i,
+                    context=context,
+                    language=language,
+                    resume_at=window_end if i == len(window_segments) - 1 else segment["end"],
+                )
+                for i, segment in enumerate(window_segments)
+            ])
+
+        segments.extend(window_segments)
+
+        return consumed, language
+
+
+    def __get_prompt(self, previous_segments):
+        return "".join(segment["text"] for segment in previous_segments[-20:])[-self.PROMPT_MAX_CHARS:]
+
+
+    def __decode_window(self, model, window, previous_segments, language, is_last):
+        # profiles without context conditioning do not carry the text across windows either
+        prompt = self.__get_prompt(previous_segments) if self.decode_options.get("condition_on_previous_text", True) else None
+
+        with WhisperModelRegistry.decode_lock(self.model_name, self.device, self.dtype):
+            result = model.transcribe(
+                window,
+                verbose=None,
+                initial_prompt=prompt or None,
+                language=language,
+                fp16=model.device.type == "cuda",
+                **self.decode_options,
+            )
+        window_segments = result["segments"]
+
+        # keep the tail segment for the next window unless it is the only one or the audio ends here
+        consumed = len(window)
+        if not is_last and len(window_segments) > 1:
+            carry_from = int(window_segments[-1]["start"] * SAMPLE_RATE)
+            if 0 < carry_from < len(window):
+                consumed = carry_from
+                window_segments = window_segments[:-1]
+
+        segments = [{key: segment[key] for key in self.SEGMENT_KEYS} for segment in window_segments]
 
-        return output
+        return consumed, segments, result["language"]
@@ -5,11 +5,17 @@ from transcripto.handlers.download_handler import process_download
 import logging
 from telegram import Update
 from telegram.ext import filters, CommandHandler, MessageHandler, Application, ContextTypes
-from config import TEMP_DIR
+from telegram.error import BadRequest
+from config import TEMP_DIR, TELEGRAM_DRAFT_MODE
+import asyncio
 
 # Telegram message limit is 4096 characters
 TELEGRAM_MAX_MESSAGE_LENGTH = 4096
 
+# Profile of the quick transcript behind the preliminary summary, refined in the background
+DRAFT_PROFILE = "draft"
+PRELIMINARY_HEADER = "⏳ Preliminary summary from a draft transcript, refining...\n\n"
+
 
 def split_message(text: str, max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> list[str]:
     """Split a long message into chunks that fit within Telegram's message limit."""
@@ -62,9 +68,87 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     )
 
 
+async def replace_messages(update: Update, context: ContextTypes.DEFAULT_TYPE, messages: list, text: str, header: str = "") -> list:
+    """
+    Replaces the text of messages already posted by the bot, posting or deleting messages
+    when the new text needs a different number of chunks.
+
+    Returns:
+        list: The messages now holding the text.
+    """
+    chunks = split_message(text, TELEGRAM_MAX_MESSAGE_LENGTH - len(header))
+    chunks[0] = header + chunks[0]
+
+    posted_messages = []
+    for i, chunk in enumerate(chunks):
+        if i < len(messages):
+            try:
+                await context.bot.edit_message_text(
+                    chat_id=messages[i].chat_id,
+                    message_id=messages[i].message_id,
+                    text=chunk
+                )
+            except BadRequest as e:
+                # the chunk did not change
+                logging.debug(f"Message {messages[i].message_id} not edited: {e}")
+            posted_messages.append(messages[i])
+        else:
+            posted_messages.append(await update.message.reply_text(chunk))
+
+    for message in messages[len(chunks):]:
+        await context.bot.delete_message(chat_id=message.chat_id, message_id=message.message_id)
+
+    return posted_messages
+
+
+async def transcribe_and_summarize(audio_local_path, file_title, transcription_engine, transcription_profile, summarization_engine, summarization_model, variant=None):
+    """
+    Runs the blocking transcription and summarization in a worker thread, so the bot keeps
+    serving other messages meanwhile.
+    """
+    transcription_text = await asyncio.to_thread(
+        process_transcription,
+        audio_local_path,
+        TEMP_DIR,
+        file_title,
+        "mp3",
+        transcription_engine,
+        language=None,
+        profile=transcription_profile,
+    )
+
+    return await asyncio.to_thread(
+        process_summarization,
+        transcription_text,
+        file_title,
+        summarization_engine,
+        summarization_model,
+        variant=variant,
+    )
+
+
+async def refine_summary(update: Update, context: ContextTypes.DEFAULT_TYPE, messages: list, audio_local_path, file_title, transcription_engine, transcription_profile, summarization_engine, summarization_model) -> None:
+    """
+    Transcribes and summarizes the episode at full quality in the background and replaces the
+    preliminary summary with it. The download and the decoded audio of the draft are reused.
+    """
+    try:
+        summary_text = await transcribe_and_summarize(
+            audio_local_path, file_title, transcription_engine, transcription_profile, summarization_engine, summarization_model
+        )
+    except Exception as e:
+        logging.error(f"Failed to refine the summary of {file_title}: {e}")
+        await update.message.reply_text(f"Refining the summary failed, the summary above is only preliminary: {e}")
+        return
+
+    await replace_messages(update, context, messages, summary_text)
+    logging.info(f"Preliminary summary of {file_title} replaced with the refined one")
+
+
 # Define a function to handle messages starting with 'https://'
 async def url_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     transcription_engine = "wisper"
+    transcription_profile = "auto"
     summarization_engine = "vertex"
     summarization_model = "gemini-3-pro-preview"
     url = update.message.text
@@ -81,52 +165,42 @@ async def url_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         )
         return None
 
-    # status update
-    await context.bot.edit_message_text(
-        chat_id=status_update_message.chat_id,
-        message_id=status_update_message.message_id,
-        text=f"Download Completed, Starting Transcription using {transcription_engine} engine."
-    )
-
     logging.info(f"Metadata extracted from {audio_local_path}: {audio_metadata}")
 
-    
-    transcription_text = process_transcription(
-        audio_local_path,
-        TEMP_DIR,
-        file_title,
-        "mp3",
-        transcription_engine,
-        language="en-US",
-    )
+    if TELEGRAM_DRAFT_MODE:
+        # status update
+        await context.bot.edit_message_text(
+            chat_id=status_update_message.chat_id,
+            message_id=status_update_message.message_id,
+            text=f"Download Completed, drafting a preliminary summary using {transcription_engine} engine..."
+        )
+
+        draft_summary_text = await transcribe_and_summarize(
+            audio_local_path, file_title, transcription_engine, DRAFT_PROFILE, summarization_engine, summarization_model, variant=DRAFT_PROFILE
+        )
+        messages = await replace_messages(update, context, [status_update_message], draft_summary_text, PRELIMINARY_HEADER)
+
+        context.application.create_task(
+            refine_summary(
+                update, context, messages, audio_local_path, file_title,
+                transcription_engine, transcription_profile, summarization_engine, summarization_model,
+            ),
+            update=update,
+        )
+        return
 
     # status update
     await context.bot.edit_message_text(
         chat_id=status_update_message.chat_id,
         message_id=status_update_message.message_id,
-        text=f"Transcription Completed, Summerizing using {summarization_engine} engine based on {summarization_model} model..."
+        text=f"Download Completed, Starting Transcription using {transcription_engine} engine and Summerizing using {summarization_engine} engine based on {summarization_model} model..."
     )
 
-    summary_text = process_summarization(
-        transcription_text,
-        file_title,
-        summarization_engine,
-        summarization_model,
+    summary_text = await transcribe_and_summarize(
+        audio_local_path, file_title, transcription_engine, transcription_profile, summarization_engine, summarization_model
     )
 
-    # Split summary into chunks if it exceeds Telegram's message limit
-    summary_chunks = split_message(summary_text)
-    
-    # Update the first message with the first chunk
-    await context.bot.edit_message_text(
-        chat_id=status_update_message.chat_id,
-        message_id=status_update_message.message_id,
-        text=summary_chunks[0]
-    )
-    
-    # Send remaining chunks as new messages
-    for chunk in summary_chunks[1:]:
-        await update.message.reply_text(chunk)
+    await replace_messages(update, context, [status_update_message], summary_text)
 
 
 async def start_loop_bot(API_TOKEN) -> None:
@@ -0,0 +1,283 @@
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+import numpy as np
+from transcripto.utils.mp3 import get_audio_metadata
+
+SAMPLE_RATE = 16000
+PCM_EXTENSION = ".pcm"
+
+
+def get_ffmpeg_path():
+    ffmpeg_path = shutil.which("ffmpeg")
+    if not ffmpeg_path:
+        raise RuntimeError("ffmpeg was not found in PATH")
+
+    return ffmpeg_path
+
+
+def is_pcm_file(audio_path):
+    return str(audio_path).endswith(PCM_EXTENSION)
+
+
+def get_atempo_filter(speed):
+    """
+    Returns the ffmpeg filter speeding audio up by `speed` while keeping its pitch,
+    a single atempo filter only accepts factors between 0.5 and 2.
+    """
+    factors = []
+    while speed > 2.0:
+        factors.append(2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        factors.append(0.5)
+        speed /= 0.5
+    factors.append(speed)
+
+    return ",".join(f"atempo={factor:.6g}" for factor in factors)
+
+
+def decode_to_pcm_file(audio_path, pcm_path, sample_rate=SAMPLE_RATE, speed=1.0):
+    """
+    Decodes an audio file once into a raw 16-bit mono PCM file.
+
+    The file is written next to its final path and renamed into place when ffmpeg
+    completes, so an interrupted decode never leaves a truncated artifact behind.
+
+    Args:
+        audio_path (str): Path to the source audio file, or a PCM artifact.
+        pcm_path (str): Path of the raw PCM file to create.
+        sample_rate (int): Output sample rate.
+        speed (float): Time compression factor applied without changing the pitch.
+    """
+    temp_path = f"{pcm_path}.part"
+    command = [get_ffmpeg_path(), "-nostdin", "-loglevel", "error", "-y"]
+    if is_pcm_file(audio_path):
+        command += ["-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE)]
+    command += ["-i", str(audio_path)]
+    if speed != 1.0:
+        command += ["-filter:a", get_atempo_filter(speed)]
+    command += [
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        temp_path,
+    ]
+
+    try:
+        subprocess.run(command, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        stderr = e.stderr.decode(errors="ignore").strip()
+        raise RuntimeError(f"Failed to decode audio {audio_path}: {stderr}") from e
+
+    os.replace(temp_path, pcm_path)
+
+
+def get_time_compressed_file(audio_path, speed):
+    """
+    Returns a pitch-preserving sped up PCM copy of an audio file, created once next to it.
+
+    Args:
+        audio_path (str): Path to the PCM artifact or audio file.
+        speed (float): Time compression factor, e.g. 1.25 plays 25% faster.
+
+    Returns:
+        str: Path to the time compressed PCM file.
+    """
+    compressed_path = f"{os.path.splitext(audio_path)[0]}_x{speed:g}{PCM_EXTENSION}"
+
+    if os.path.exists(compressed_path) and os.path.getmtime(compressed_path) >= os.path.getmtime(audio_path):
+        logging.info(f"Using existing time compressed audio: {compressed_path}")
+        return compressed_path
+
+    logging.info(f"Compressing {audio_path} to {speed:g}x speed...")
+    decode_to_pcm_file(audio_path, compressed_path, speed=speed)
+
+    return compressed_path
+
+
+def load_pcm(pcm_path):
+    """
+    Maps a raw PCM file created by `decode_to_pcm_file` without reading it into memory.
+
+    Returns:
+        np.memmap: Read-only int16 samples at `SAMPLE_RATE`.
+    """
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=np.int16)
+
+    return np.memmap(pcm_path, dtype=np.int16, mode="r")
+
+
+def get_audio_duration(audio_path):
+    """
+    Returns:
+        float: Duration in seconds, read from the size of a PCM artifact or the MP3 headers.
+    """
+    if is_pcm_file(audio_path):
+        return os.path.getsize(audio_path) / 2 / SAMPLE_RATE
+
+    return get_audio_metadata(audio_path).get("duration", 0.0)
+
+
+def load_audio(audio_path):
+    """
+    Loads a whole audio file as float32 samples, mapping PCM artifacts instead of decoding them.
+
+    Returns:
+        np.ndarray: Mono float32 samples at `SAMPLE_RATE` normalized to [-1, 1).
+    """
+    if is_pcm_file(audio_path):
+        return load_pcm(audio_path).astype(np.float32) / 32768.0
+
+    return np.concatenate(list(iter_pcm_blocks(audio_path, block_seconds=600)) or [np.zeros(0, dtype=np.float32)])
+
+
+def iter_pcm_blocks(audio_path, block_seconds=30, sample_rate=SAMPLE_RATE, start_seconds=0, duration_seconds=None):
+    """
+    Decodes an audio file through an ffmpeg pipe and yields it in fixed size blocks,
+    so only one block is held in memory at a time regardless of the file duration.
+    PCM artifacts are sliced from a memory map instead of being decoded again.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        block_seconds (float): Duration of every yielded block, the last one may be shorter.
+        sample_rate (int): Output sample rate.
+        start_seconds (float): Offset to start decoding from.
+        duration_seconds (float): Maximum duration to decode, None decodes to the end.
+
+    Yields:
+        np.ndarray: Mono float32 samples normalized to [-1, 1).
+    """
+    block_samples = int(block_seconds * sample_rate)
+
+    if is_pcm_file(audio_path):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"PCM artifacts are stored at {SAMPLE_RATE} Hz, got {sample_rate}")
+
+        samples = load_pcm(audio_path)
+        start = int(start_seconds * sample_rate)
+        end = len(samples) if duration_seconds is None else min(len(samples), start + int(duration_seconds * sample_rate))
+
+        for block_start in range(start, end, block_samples):
+            yield samples[block_start:min(block_start + block_samples, end)].astype(np.float32) / 32768.0
+        return
+
+    command = [
+        get_ffmpeg_path(),
+        "-nostdin",
+        "-loglevel", "error",
+        "-ss", str(start_seconds),
+        "-i", str(audio_path),
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+    ]
+    if duration_seconds is not None:
+        command += ["-t", str(duration_seconds)]
+    command.append("-")
+
+    block_bytes = block_samples * 2
+
+    # stderr goes to a file, a pipe nobody reads before stdout ends would stall a noisy ffmpeg
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+    completed = False
+
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+
+            # an odd trailing byte can only happen on a truncated stream
+            data = data[:len(data) - len(data) % 2]
+            yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+        completed = True
+    finally:
+        process.stdout.close()
+        if not completed:
+            process.kill()
+
+        return_code = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="ignore")
+        stderr_file.close()
+
+    if return_code != 0:
+        logging.error(f"ffmpeg failed decoding {audio_path}: {stderr}")
+        raise RuntimeError(f"Failed to decode audio {audio_path}: {stderr.strip()}")
+
+
+def compute_frame_loudness(audio_path, frame_seconds=0.1, sample_rate=SAMPLE_RATE):
+    """
+    Computes the loudness of every frame of an audio file, one decoded block at a time.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        frame_seconds (float): Frame duration.
+        sample_rate (int): Decoding sample rate.
+
+    Returns:
+        np.ndarray: Loudness of every frame in dBFS, a trailing partial frame is dropped.
+    """
+    frame_samples = int(frame_seconds * sample_rate)
+    block_seconds = frame_samples * max(1, int(60 / frame_seconds)) / sample_rate
+
+    loudness = []
+    for block in iter_pcm_blocks(audio_path, block_seconds, sample_rate):
+        usable = len(block) - len(block) % frame_samples
+        if usable == 0:
+            continue
+
+        frames = block[:usable].reshape(-1, frame_samples)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        loudness.append(20 * np.log10(np.maximum(rms, 1e-10)))
+
+    if not loudness:
+        return np.zeros(0, dtype=np.float32)
+
+    return np.concatenate(loudness)
+
+
+def find_silence_split_points(frame_loudness, frame_seconds, segments, search_seconds=30, smoothing_seconds=0.5):
+    """
+    Picks split points that cut the audio into roughly equal segments, moving every cut
+    to the quietest moment within `search_seconds` of its target so words are not split.
+
+    Args:
+        frame_loudness (np.ndarray): Per-frame loudness as returned by `compute_frame_loudness`.
+        frame_seconds (float): Frame duration used to compute the loudness.
+        segments (int): Number of segments to split into.
+        search_seconds (float): How far from the even split target a cut may move.
+        smoothing_seconds (float): Loudness is averaged over this span to favour pauses over single quiet frames.
+
+    Returns:
+        list[float]: Sorted split points in seconds, `segments - 1` of them at most.
+    """
+    total_frames = len(frame_loudness)
+    if segments <= 1 or total_frames == 0:
+        return []
+
+    kernel_size = max(1, int(smoothing_seconds / frame_seconds))
+    smoothed = np.convolve(frame_loudness, np.ones(kernel_size) / kernel_size, mode="same")
+    search_frames = int(search_seconds / frame_seconds)
+
+    split_frames = []
+    for i in range(1, segments):
+        target = total_frames * i // segments
+        low = max(target - search_frames, split_frames[-1] + 1 if split_frames else 1)
+        high = min(target + search_frames, total_frames - 1)
+        if low >= high:
+            continue
+
+        split_frames.append(low + int(np.argmin(smoothed[low:high])))
+
+    return [frame * frame_seconds for frame in split_frames]
@@ -0,0 +1,77 @@
+import os
+import glob
+import json
+import logging
+import threading
+
+
+class TranscriptionCheckpoint:
+    """
+    Append-only JSON lines sidecar recording transcription progress.
+
+    Every record is flushed and synced as soon as it is written, so a worker that
+    dies mid-episode loses at most the segment it was decoding.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+
+    def load(self):
+        """
+        Returns:
+            list[dict]: Records written so far, a torn trailing line is dropped.
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        records = []
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                valid_size += len(line)
+
+        # drop a record torn by a crash, otherwise new records would be appended after it
+        if valid_size < os.path.getsize(self.path):
+            logging.warning(f"Dropping incomplete checkpoint record in {self.path}")
+            os.truncate(self.path, valid_size)
+
+        if records:
+            logging.info(f"Resuming from checkpoint {self.path} with {len(records)} records")
+
+        return records
+
+
+    def append(self, records):
+        if not records:
+            return
+
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+    def part(self, index, count):
+        """
+        Returns the checkpoint of one part of a transcription split across workers.
+        """
+        return TranscriptionCheckpoint(f"{self.path}.part{index}of{count}")
+
+
+    def clear(self):
+        """
+        Removes the checkpoint together with the checkpoints of all its parts.
+        """
+        for path in [self.path] + glob.glob(f"{glob.escape(self.path)}.part*"):
+            if os.path.exists(path):
+                os.remove(path)
+                logging.debug(f"Removed checkpoint {path}")
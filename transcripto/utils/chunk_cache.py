@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+
+
+class ChunkTranscriptCache:
+    """
+    Persistent cache of recognized chunk text, keyed by a hash of the chunk audio and the
+    language, so a rerun only sends new or previously failed chunks to the recognizer.
+
+    The connection is shared by the threads recognizing the chunks and guarded by a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        self._connection.commit()
+
+
+    @staticmethod
+    def get_key(raw_data, sample_rate, sample_width, language):
+        digest = hashlib.sha1(raw_data)
+        digest.update(f"{sample_rate}:{sample_width}:{language}".encode("utf-8"))
+
+        return digest.hexdigest()
+
+
+    def get(self, key):
+        """
+        Returns:
+            str: The cached text, None when the chunk was never recognized.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT text FROM chunks WHERE key = ?", (key,)).fetchone()
+
+        return row[0] if row else None
+
+
+    def set(self, key, text):
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO chunks (key, text) VALUES (?, ?)", (key, text))
+            self._connection.commit()
+
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+        logging.debug(f"Closed chunk cache {self.path}")
@@ -0,0 +1,60 @@
+import os
+import logging
+import torch
+
+
+def get_available_cores():
+    """
+    Returns:
+        list[int]: Cores this process may run on, respecting an inherited affinity mask.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(threads_per_worker, workers=None):
+    """
+    Splits the available cores into disjoint sets, one per worker.
+
+    Args:
+        threads_per_worker (int): Cores given to every worker.
+        workers (int): Number of workers, derived from the core count when None.
+
+    Returns:
+        list[list[int]]: Cores of every worker.
+    """
+    cores = get_available_cores()
+    threads_per_worker = max(1, min(threads_per_worker, len(cores)))
+
+    max_workers = max(1, len(cores) // threads_per_worker)
+    if workers is None or workers > max_workers:
+        if workers is not None:
+            logging.warning(f"{workers} workers of {threads_per_worker} threads do not fit on {len(cores)} cores, using {max_workers}")
+        workers = max_workers
+
+    return [cores[i * threads_per_worker:(i + 1) * threads_per_worker] for i in range(workers)]
+
+
+def pin_current_process(cores):
+    """
+    Pins the current process to `cores` and sizes the torch thread pools to match,
+    so workers sharing a host do not oversubscribe each other's cores.
+
+    Args:
+        cores (list[int]): Cores the process may run on.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    else:
+        logging.warning("CPU affinity is not supported on this platform, only limiting the thread count")
+
+    torch.set_num_threads(len(cores))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # can only be set before the first parallel torch call of the process
+        logging.debug("Inter-op thread count already set for this process")
+
+    logging.info(f"Worker {os.getpid()} pinned to cores {cores}")
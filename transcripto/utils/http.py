@@ -1,5 +1,90 @@
 import re
+import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_TIMEOUT_SECONDS
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter applying a default timeout to requests that do not set one.
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT_SECONDS, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        return super().send(request, **kwargs)
+
+
+class HTTPClientRegistry:
+    """
+    Process-wide HTTP sessions, one per client name, all mounted on a single adapter.
+
+    The adapter owns the per-host connection pools, so every client reaching the same host,
+    a podcast CDN for example, reuses its warm keep-alive and TLS connections. Connection
+    errors and throttling or server error statuses of idempotent requests are retried with
+    exponential backoff, honouring Retry-After.
+    """
+    _adapter = None
+    _sessions = {}
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def get_adapter(cls):
+        with cls._lock:
+            if cls._adapter is None:
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_BACKOFF_FACTOR,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET", "HEAD", "OPTIONS"),
+                    respect_retry_after_header=True,
+                    # the response is handed back, callers check the status themselves
+                    raise_on_status=False,
+                )
+                cls._adapter = TimeoutHTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=retry,
+                )
+
+            return cls._adapter
+
+
+    @classmethod
+    def get_session(cls, name, headers=None):
+        """
+        Returns the session of a client, created with `headers` on first use.
+
+        Args:
+            name (str): Client name, clients with the same name share headers and cookies.
+            headers (dict): Default headers of the session.
+
+        Returns:
+            requests.Session: Session backed by the shared connection pools.
+        """
+        adapter = cls.get_adapter()
+
+        with cls._lock:
+            session = cls._sessions.get(name)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(headers or {})
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._sessions[name] = session
+                logging.debug(f"Created HTTP session {name}")
+
+            return session
 
 
 def verify_response(response: requests.Response):
@@ -0,0 +1,42 @@
+import logging
+
+MEMORY_FIELDS = {
+    "Rss": "rss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def get_memory_usage(pid="self"):
+    """
+    Reads the resident memory of a process split into pages shared with other
+    processes (e.g. copy-on-write pages inherited from a parent) and private pages.
+
+    Args:
+        pid (int|str): Process id, the current process by default.
+
+    Returns:
+        dict: 'rss', 'shared' and 'private' in MB, empty when /proc is not available.
+    """
+    usage = {"rss": 0.0, "shared": 0.0, "private": 0.0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                field = MEMORY_FIELDS.get(name)
+                if field:
+                    usage[field] += int(value.split()[0]) / 1024
+    except OSError as e:
+        logging.debug(f"Memory usage of process {pid} is not available: {e}")
+        return {}
+
+    return usage
+
+
+def format_memory_usage(usage):
+    if not usage:
+        return "memory usage unavailable"
+
+    return f"RSS {usage['rss']:.0f}MB ({usage['shared']:.0f}MB shared, {usage['private']:.0f}MB private)"
@@ -0,0 +1,80 @@
+import time
+import logging
+import threading
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket capping the request rate, bursts up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum tokens stored, one second worth of tokens when None.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_seconds = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Bounds the requests in flight with an additive increase, multiplicative decrease limit:
+    every window of successful requests raises the limit by one, a throttled request cuts it
+    by `decrease_factor`, so the concurrency settles just below what the service accepts.
+    """
+
+    def __init__(self, initial_limit=2, min_limit=1, max_limit=8, decrease_factor=0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+
+    def release(self, throttled=False):
+        """
+        Frees a slot and adjusts the limit to the outcome of the request.
+
+        Args:
+            throttled (bool): The request was rejected or failed because of the load.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                logging.debug(f"Request throttled, concurrency limit cut to {int(self.limit)}")
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
@@ -0,0 +1,132 @@
+import os
+import math
+import struct
+import logging
+
+
+class SegmentStore:
+    """
+    Compact binary store of timestamped transcript segments, written next to the text transcript.
+
+    Layout: a header, one fixed-size record per segment sorted by time, then the UTF-8 text
+    of all segments. Every record holds the start, end and average log probability of its
+    segment, the latest end of the records up to it and the position of its text, so a time
+    range is found by a binary search over the records and only the matching records and
+    text are read from disk.
+    """
+    MAGIC = b"TSEG"
+    VERSION = 2
+    HEADER = struct.Struct("<4sHI")
+    # start, end, latest end so far, avg_logprob, text offset, text length
+    RECORD = struct.Struct("<dddfII")
+
+    def __init__(self, path):
+        self.path = path
+
+
+    def write(self, segments):
+        """
+        Writes the segments, replacing the store atomically.
+
+        Args:
+            segments (list[dict]): Segments with start, end, text and, for Whisper, avg_logprob.
+        """
+        segments = sorted(segments, key=lambda segment: (segment["start"], segment["end"]))
+
+        records = []
+        texts = []
+        text_offset = 0
+        max_end = -math.inf
+        for segment in segments:
+            text = segment["text"].encode("utf-8")
+            avg_logprob = segment.get("avg_logprob")
+            # decoded segments may end before they start
+            end = max(segment["start"], segment["end"])
+            # a long segment can outlast the shorter ones after it, the search runs over the latest end instead
+            max_end = max(max_end, end)
+            records.append(self.RECORD.pack(
+                segment["start"],
+                end,
+                max_end,
+                math.nan if avg_logprob is None else avg_logprob,
+                text_offset,
+                len(text),
+            ))
+            texts.append(text)
+            text_offset += len(text)
+
+        temp_path = f"{self.path}.part"
+        with open(temp_path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(records)))
+            f.writelines(records)
+            f.writelines(texts)
+        os.replace(temp_path, self.path)
+
+        logging.debug(f"Saved {len(records)} segments to {self.path}")
+
+
+    def get_segments(self, start_seconds=0.0, end_seconds=None):
+        """
+        Returns the segments overlapping a time range, without reading the rest of the store.
+
+        Args:
+            start_seconds (float): Start of the range.
+            end_seconds (float): End of the range, None reads to the end of the transcript.
+
+        Returns:
+            list[dict]: Segments with start, end, text and avg_logprob, in order.
+        """
+        with open(self.path, "rb") as f:
+            count = self.__read_header(f)
+
+            # no segment before the first record whose latest end is past the range start overlaps it
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if self.__read_record(f, middle)[2] <= start_seconds:
+                    low = middle + 1
+                else:
+                    high = middle
+
+            text_start = self.HEADER.size + count * self.RECORD.size
+            segments = []
+            for index in range(low, count):
+                start, end, _, avg_logprob, text_offset, text_length = self.__read_record(f, index)
+                if end_seconds is not None and start >= end_seconds:
+                    break
+                if end <= start_seconds:
+                    continue
+
+                f.seek(text_start + text_offset)
+                segments.append({
+                    "start": start,
+                    "end": end,
+                    "text": f.read(text_length).decode("utf-8"),
+                    "avg_logprob": None if math.isnan(avg_logprob) else avg_logprob,
+                })
+
+        return segments
+
+
+    def get_text(self, start_seconds=0.0, end_seconds=None):
+        """
+        Returns:
+            str: Text of the segments overlapping the time range.
+        """
+        texts = (segment["text"].strip() for segment in self.get_segments(start_seconds, end_seconds))
+
+        return " ".join(text for text in texts if text)
+
+
+    def __read_header(self, f):
+        magic, version, count = self.HEADER.unpack(f.read(self.HEADER.size))
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"Unsupported segment store {self.path}")
+
+        return count
+
+
+    def __read_record(self, f, index):
+        f.seek(self.HEADER.size + index * self.RECORD.size)
+
+        return self.RECORD.unpack(f.read(self.RECORD.size))
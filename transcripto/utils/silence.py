@@ -0,0 +1,278 @@
+import math
+import logging
+import numpy as np
+from transcripto.utils.audio import SAMPLE_RATE
+
+# milliseconds of samples squared and summed at once, bounds the int64 scratch memory
+BLOCK_MS = 60_000
+
+# frame of the loudness histogram, and the silences and loudness quantiles tried as split criteria
+LOUDNESS_FRAME_MS = 50
+CALIBRATION_SILENCE_LENGTHS_MS = (1000, 700, 500, 300, 200)
+CALIBRATION_QUANTILES = (0.1, 0.2, 0.3, 0.4, 0.5)
+
+
+class SilenceSplitter:
+    """
+    Silence detection with the semantics of `pydub.silence`, computed over a whole buffer of
+    samples with NumPy instead of one Python-level slice per millisecond.
+
+    The energy of every millisecond is summed once, then the RMS of every sliding window of
+    `min_silence_len` comes out of a cumulative sum. Windows cover the same frames, are padded
+    the same way at the end and compare the same truncated integer RMS against the threshold
+    as pydub, so the ranges are identical.
+    """
+
+    def __init__(self, samples, sample_rate=SAMPLE_RATE, sample_width=2):
+        """
+        Args:
+            samples (np.ndarray): Mono integer samples.
+            sample_rate (int): Sample rate of `samples`.
+            sample_width (int): Bytes per sample, sets the full scale of the dBFS thresholds.
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.max_amplitude = 2 ** (8 * sample_width - 1)
+        self.length_ms = round(1000 * len(samples) / sample_rate)
+
+        # first frame of every millisecond, as pydub computes it when slicing
+        self.ms_frames = (np.arange(self.length_ms + 1) * (sample_rate / 1000.0)).astype(np.int64)
+        self.ms_energy_cumsum = np.concatenate([[0], np.cumsum(self.__compute_ms_energy())])
+
+
+    @classmethod
+    def from_audio_segment(cls, audio):
+        """
+        Wraps the samples of a mono pydub AudioSegment without copying them.
+        """
+        samples = np.frombuffer(audio.raw_data, dtype=f"<i{audio.sample_width}")
+
+        return cls(samples, audio.frame_rate, audio.sample_width)
+
+
+    @property
+    def dbfs(self):
+        """
+        Loudness of the whole buffer relative to full scale, same as `AudioSegment.dBFS`.
+        """
+        if not len(self.samples):
+            return -math.inf
+
+        # the last millisecond boundary can fall before the last sample
+        tail = self.samples[min(self.ms_frames[-1], len(self.samples)):].astype(np.int64)
+        energy = int(self.ms_energy_cumsum[-1]) + int(np.sum(tail * tail))
+        rms = int(math.sqrt(energy / len(self.samples)))
+
+        # math.log(x, 10) rather than log10, so thresholds derived from it match pydub to the last bit
+        return 20 * math.log(rms / self.max_amplitude, 10) if rms else -math.inf
+
+
+    def detect_silence(self, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+        """
+        Returns:
+            list[list[int]]: [start, end] of every silent section in milliseconds.
+        """
+        if self.length_ms < min_silence_len:
+            return []
+
+        threshold = 10 ** (silence_thresh / 20) * self.max_amplitude
+
+        last_start = self.length_ms - min_silence_len
+        starts = np.arange(0, last_start + 1, seek_step)
+        if last_start % seek_step:
+            starts = np.append(starts, last_start)
+
+        ends = starts + min_silence_len
+        energy = self.ms_energy_cumsum[ends] - self.ms_energy_cumsum[starts]
+        # frames past the end of the buffer are padded with silence and count toward the mean
+        counts = self.ms_frames[ends] - self.ms_frames[starts]
+        rms = np.floor(np.sqrt(energy / counts))
+
+        silence_starts = starts[rms <= threshold]
+        if not len(silence_starts):
+            return []
+
+        # overlapping silent windows join, a window after a gap longer than the window opens a new range
+        gaps = np.diff(silence_starts)
+        breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+
+        range_starts = np.concatenate([silence_starts[:1], silence_starts[breaks + 1]])
+        range_ends = np.concatenate([silence_starts[breaks], silence_starts[-1:]]) + min_silence_len
+
+        return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
+
+
+    def detect_nonsilent(self, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+        """
+        Returns:
+            list[list[int]]: [start, end] of every nonsilent section in milliseconds.
+        """
+        silent_ranges = self.detect_silence(min_silence_len, silence_thresh, seek_step)
+
+        if not silent_ranges:
+            return [[0, self.length_ms]]
+
+        if silent_ranges[0][0] == 0 and silent_ranges[0][1] == self.length_ms:
+            return []
+
+        nonsilent_ranges = []
+        previous_end = 0
+        for start, end in silent_ranges:
+            nonsilent_ranges.append([previous_end, start])
+            previous_end = end
+
+        if previous_end != self.length_ms:
+            nonsilent_ranges.append([previous_end, self.length_ms])
+
+        if nonsilent_ranges[0] == [0, 0]:
+            nonsilent_ranges.pop(0)
+
+        return nonsilent_ranges
+
+
+    def split_on_silence(self, min_silence_len=1000, silence_thresh=-16, keep_silence=100, seek_step=1):
+        """
+        Same as `pydub.silence.split_on_silence`, but returns the chunk positions instead of the chunks.
+
+        Args:
+            keep_silence (int | bool): Silence kept around every chunk in milliseconds, True keeps all of it.
+
+        Returns:
+            list[tuple[int, int]]: (start, end) of every chunk in milliseconds.
+        """
+        if isinstance(keep_silence, bool):
+            keep_silence = self.length_ms if keep_silence else 0
+
+        ranges = [
+            [start - keep_silence, end + keep_silence]
+            for start, end in self.detect_nonsilent(min_silence_len, silence_thresh, seek_step)
+        ]
+
+        # padding overlapping the next chunk is split at the midpoint
+        for current_range, next_range in zip(ranges, ranges[1:]):
+            if next_range[0] < current_range[1]:
+                current_range[1] = (current_range[1] + next_range[0]) // 2
+                next_range[0] = current_range[1]
+
+        return [(max(start, 0), min(end, self.length_ms)) for start, end in ranges]
+
+
+    def get_frame_loudness(self, frame_ms=LOUDNESS_FRAME_MS):
+        """
+        Returns:
+            np.ndarray: Loudness of every frame in dBFS, a trailing partial frame is ignored.
+        """
+        edges = np.arange(self.length_ms // frame_ms + 1) * frame_ms
+        energy = self.ms_energy_cumsum[edges[1:]] - self.ms_energy_cumsum[edges[:-1]]
+        rms = np.sqrt(energy / (self.ms_frames[edges[1:]] - self.ms_frames[edges[:-1]]))
+
+        return 20 * np.log10(np.maximum(rms, 1) / self.max_amplitude)
+
+
+    def calibrate(self, min_chunk_ms, max_chunk_ms, keep_silence=100):
+        """
+        Picks the silence criteria that cut the most audio into chunks within the target
+        duration range. Thresholds come from the loudness histogram of the file, the level
+        below which the quietest 10% to 50% of its frames fall, tried with every silence length.
+
+        Returns:
+            tuple[int, float]: min_silence_len in milliseconds and silence_thresh in dBFS.
+        """
+        loudness = self.get_frame_loudness()
+        if not len(loudness):
+            return CALIBRATION_SILENCE_LENGTHS_MS[0], self.dbfs
+
+        counts, bin_edges = np.histogram(loudness, bins=np.arange(np.floor(loudness.min()), np.ceil(loudness.max()) + 2))
+        cumulative_share = np.cumsum(counts) / len(loudness)
+        thresholds = sorted({float(bin_edges[np.searchsorted(cumulative_share, quantile) + 1]) for quantile in CALIBRATION_QUANTILES})
+
+        best_criteria, best_score = None, -1.0
+        for min_silence_len in CALIBRATION_SILENCE_LENGTHS_MS:
+            for silence_thresh in thresholds:
+                ranges = self.split_on_silence(min_silence_len, silence_thresh, keep_silence)
+                in_range_ms = sum(end - start for start, end in ranges if min_chunk_ms <= end - start <= max_chunk_ms)
+                score = in_range_ms / self.length_ms
+                if score > best_score:
+                    best_criteria, best_score = (min_silence_len, silence_thresh), score
+
+        logging.info(
+            f"Calibrated silence split: {best_criteria[0]}ms below {best_criteria[1]:.1f} dBFS, "
+            f"{best_score:.0%} of the audio in {min_chunk_ms / 1000:.0f}-{max_chunk_ms / 1000:.0f}s chunks"
+        )
+
+        return best_criteria
+
+
+    def split_balanced(self, min_chunk_ms, max_chunk_ms, keep_silence=100):
+        """
+        Splits on silence with calibrated criteria, then merges chunks shorter than the range
+        into their neighbour and cuts chunks longer than it at their quietest moments.
+
+        Returns:
+            list[tuple[int, int]]: (start, end) of every chunk in milliseconds.
+        """
+        min_silence_len, silence_thresh = self.calibrate(min_chunk_ms, max_chunk_ms, keep_silence)
+        ranges = self.split_on_silence(min_silence_len, silence_thresh, keep_silence)
+
+        merged_ranges = []
+        for start, end in ranges:
+            if merged_ranges:
+                previous_start, previous_end = merged_ranges[-1]
+                short = previous_end - previous_start < min_chunk_ms or end - start < min_chunk_ms
+                if short and end - previous_start <= max_chunk_ms:
+                    merged_ranges[-1] = (previous_start, end)
+                    continue
+            merged_ranges.append((start, end))
+
+        balanced_ranges = []
+        for start, end in merged_ranges:
+            balanced_ranges.extend(self.__split_long_range(start, end, max_chunk_ms))
+
+        return balanced_ranges
+
+
+    def __split_long_range(self, start, end, max_chunk_ms):
+        if end - start <= max_chunk_ms:
+            return [(start, end)]
+
+        # every cut may move a quarter piece either way, so a piece can grow by half
+        pieces = math.ceil((end - start) / (max_chunk_ms * 2 / 3))
+
+        piece_ms = (end - start) / pieces
+        cuts = []
+        for index in range(1, pieces):
+            # the quietest frame within a quarter piece of the even cut
+            target = start + index * piece_ms
+            search_start = int(max(cuts[-1] if cuts else start, target - piece_ms / 4))
+            search_end = int(min(end, target + piece_ms / 4))
+            cuts.append(self.__find_quietest_ms(search_start, search_end))
+
+        boundaries = [start] + cuts + [end]
+
+        return list(zip(boundaries, boundaries[1:]))
+
+
+    def __find_quietest_ms(self, start, end, window_ms=LOUDNESS_FRAME_MS):
+        positions = np.arange(start, max(start + 1, end - window_ms + 1))
+        window_ends = np.minimum(positions + window_ms, self.length_ms)
+        energy = self.ms_energy_cumsum[window_ends] - self.ms_energy_cumsum[positions]
+
+        return int(positions[np.argmin(energy)] + window_ms // 2)
+
+
+    def __compute_ms_energy(self):
+        ms_energy = np.zeros(self.length_ms, dtype=np.int64)
+        frames = np.minimum(self.ms_frames, len(self.samples))
+
+        for block_start in range(0, self.length_ms, BLOCK_MS):
+            block_end = min(block_start + BLOCK_MS, self.length_ms)
+            first_frame = frames[block_start]
+
+            block = self.samples[first_frame:frames[block_end]].astype(np.int64)
+            block_cumsum = np.concatenate([[0], np.cumsum(block * block)])
+            ms_energy[block_start:block_end] = (
+                block_cumsum[frames[block_start + 1:block_end + 1] - first_frame]
+                - block_cumsum[frames[block_start:block_end] - first_frame]
+            )
+
+        return ms_energy
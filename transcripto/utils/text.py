@@ -46,6 +46,69 @@ def split_text_into_paragraphs(text, max_sentences=5):
     return '\n\n'.join(paragraphs)
 
 
+def remove_overlapping_prefix(previous_text, next_text, max_words=30, min_words=2):
+    """
+    Removes the words at the start of `next_text` that repeat the end of `previous_text`,
+    used to stitch transcripts of audio segments that overlap at their seams.
+
+    Args:
+        previous_text (str): Text of the preceding segment.
+        next_text (str): Text of the following segment.
+        max_words (int): Longest overlap to look for, in words.
+        min_words (int): Shortest overlap to remove, single common words are too ambiguous.
+
+    Returns:
+        str: `next_text` without the repeated leading words.
+    """
+    def normalize(word):
+        return re.sub(r'[^\w]', '', word).lower()
+
+    previous_words = [normalize(word) for word in previous_text.split()[-max_words:]]
+    next_words = next_text.split()
+    normalized_next_words = [normalize(word) for word in next_words[:max_words]]
+
+    for overlap in range(min(len(previous_words), len(normalized_next_words)), min_words - 1, -1):
+        if previous_words[-overlap:] == normalized_next_words[:overlap]:
+            remaining_words = next_words[overlap:]
+            return (" " + " ".join(remaining_words)) if remaining_words else ""
+
+    return next_text
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Computes the word error rate of a transcript against a reference, ignoring case and punctuation.
+
+    Args:
+        reference (str): Reference transcript.
+        hypothesis (str): Transcript to score.
+
+    Returns:
+        float: (substitutions + deletions + insertions) / reference words.
+    """
+    def normalize(text):
+        return [word for word in (re.sub(r'[^\w]', '', word).lower() for word in text.split()) if word]
+
+    reference_words = normalize(reference)
+    hypothesis_words = normalize(hypothesis)
+    if not reference_words:
+        return float(len(hypothesis_words) > 0)
+
+    # edit distance over words, one row at a time
+    previous_row = list(range(len(hypothesis_words) + 1))
+    for i, reference_word in enumerate(reference_words, start=1):
+        current_row = [i]
+        for j, hypothesis_word in enumerate(hypothesis_words, start=1):
+            current_row.append(min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (reference_word != hypothesis_word),
+            ))
+        previous_row = current_row
+
+    return previous_row[-1] / len(reference_words)
+
+
 def strip_html_tags(text):
     """
     Strips all HTML tags from the given text.
@@ -0,0 +1,141 @@
+import logging
+import numpy as np
+from transcripto.utils.audio import iter_pcm_blocks, SAMPLE_RATE
+
+SPEECH_BAND_HZ = (300, 3400)
+
+
+def compute_vad_features(samples, frame_samples, sample_rate=SAMPLE_RATE):
+    """
+    Computes per-frame features of a block of samples in one vectorized pass.
+
+    Args:
+        samples (np.ndarray): Mono float32 samples, a trailing partial frame is ignored.
+        frame_samples (int): Samples per frame.
+        sample_rate (int): Sample rate of `samples`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Frame energy in dBFS and the share of the
+            frame spectrum energy that falls inside the speech band.
+    """
+    usable = len(samples) - len(samples) % frame_samples
+    frames = samples[:usable].reshape(-1, frame_samples)
+
+    energy_db = 10 * np.log10(np.maximum(np.mean(np.square(frames), axis=1), 1e-12))
+
+    spectrum = np.square(np.abs(np.fft.rfft(frames * np.hanning(frame_samples), axis=1)))
+    frequencies = np.fft.rfftfreq(frame_samples, 1 / sample_rate)
+    in_band = (frequencies >= SPEECH_BAND_HZ[0]) & (frequencies <= SPEECH_BAND_HZ[1])
+    band_ratio = spectrum[:, in_band].sum(axis=1) / np.maximum(spectrum.sum(axis=1), 1e-12)
+
+    return energy_db, band_ratio
+
+
+def _rolling_std(values, window):
+    if len(values) < window:
+        return np.full(len(values), np.std(values) if len(values) else 0.0)
+
+    padded = np.pad(values, (window // 2, window - window // 2 - 1), mode="edge")
+    cumsum = np.concatenate([[0.0], np.cumsum(padded)])
+    cumsum_sq = np.concatenate([[0.0], np.cumsum(np.square(padded))])
+
+    mean = (cumsum[window:] - cumsum[:-window]) / window
+    mean_sq = (cumsum_sq[window:] - cumsum_sq[:-window]) / window
+
+    return np.sqrt(np.maximum(mean_sq - np.square(mean), 0))
+
+
+def _mask_to_regions(mask):
+    """
+    Returns [start, end) frame index pairs of the True runs in a boolean mask.
+    """
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    return list(zip(starts, ends))
+
+
+def detect_speech_regions(
+    audio_path,
+    frame_seconds=0.03,
+    energy_margin_db=12,
+    min_energy_db=-55,
+    min_band_ratio=0.45,
+    min_modulation_db=3.0,
+    min_speech_seconds=0.5,
+    max_gap_seconds=1.0,
+    padding_seconds=0.3,
+):
+    """
+    Finds the speech regions of an audio file with an energy and spectral detector.
+
+    A frame counts as speech when it is louder than the noise floor, most of its energy
+    sits in the speech band, and its loudness fluctuates at syllable rate, which
+    sustained music beds and dead air do not do.
+
+    Args:
+        audio_path (str): Path to the PCM artifact or audio file.
+        frame_seconds (float): Analysis frame duration.
+        energy_margin_db (float): Required loudness above the estimated noise floor.
+        min_energy_db (float): Frames quieter than this are never speech.
+        min_band_ratio (float): Minimal share of the frame energy inside the speech band.
+        min_modulation_db (float): Minimal loudness deviation over the surrounding second.
+        min_speech_seconds (float): Shorter speech regions are dropped.
+        max_gap_seconds (float): Regions separated by shorter gaps are merged.
+        padding_seconds (float): Padding added around every region.
+
+    Returns:
+        tuple[list[tuple[float, float]], float]: Speech regions as (start, duration)
+            in seconds and the total audio duration.
+    """
+    frame_samples = int(frame_seconds * SAMPLE_RATE)
+    block_seconds = frame_samples * max(1, int(60 / frame_seconds)) / SAMPLE_RATE
+
+    energy_blocks = []
+    band_ratio_blocks = []
+    for block in iter_pcm_blocks(audio_path, block_seconds):
+        energy_db, band_ratio = compute_vad_features(block, frame_samples)
+        energy_blocks.append(energy_db)
+        band_ratio_blocks.append(band_ratio)
+
+    if not energy_blocks:
+        return [], 0.0
+
+    energy_db = np.concatenate(energy_blocks)
+    band_ratio = np.concatenate(band_ratio_blocks)
+    total_duration = len(energy_db) * frame_seconds
+
+    noise_floor_db = np.percentile(energy_db, 10)
+    energy_threshold = max(noise_floor_db + energy_margin_db, min_energy_db)
+    modulation_db = _rolling_std(energy_db, max(1, int(1.0 / frame_seconds)))
+
+    speech = (energy_db > energy_threshold) & (band_ratio >= min_band_ratio) & (modulation_db >= min_modulation_db)
+
+    regions = []
+    max_gap_frames = int(max_gap_seconds / frame_seconds)
+    for start, end in _mask_to_regions(speech):
+        if regions and start - regions[-1][1] <= max_gap_frames:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    speech_regions = []
+    for start, end in regions:
+        if (end - start) * frame_seconds < min_speech_seconds:
+            continue
+
+        region_start = max(0.0, float(start) * frame_seconds - padding_seconds)
+        region_end = min(total_duration, float(end) * frame_seconds + padding_seconds)
+        if speech_regions and region_start <= speech_regions[-1][1]:
+            speech_regions[-1][1] = region_end
+        else:
+            speech_regions.append([region_start, region_end])
+
+    speech_duration = sum(end - start for start, end in speech_regions)
+    logging.info(
+        f"VAD found {len(speech_regions)} speech regions, {speech_duration:.0f}s of {total_duration:.0f}s "
+        f"(noise floor {noise_floor_db:.1f} dB)"
+    )
+
+    return [(float(start), float(end - start)) for start, end in speech_regions], float(total_duration)